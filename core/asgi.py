@@ -3,6 +3,10 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Long-lived responses such as the order event stream (``/api/orders/events/``)
+need this entrypoint, e.g. ``uvicorn core.asgi:application``; the WSGI
+entrypoint keeps serving every other endpoint.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,161 @@
+import base64
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IMAGE_DERIVATIVE_SETTINGS = {
+    'ASYNC': True,
+    'WORKERS': 2,
+    'SIZES': {
+        'thumbnail': (480, 360),
+        'small': (120, 120),
+    },
+    'PLACEHOLDER_SIZE': (16, 16),
+    'QUALITY': 80,
+}
+
+_executor = None
+
+
+def get_image_derivative_settings():
+    return {**DEFAULT_IMAGE_DERIVATIVE_SETTINGS, **getattr(settings, 'IMAGE_DERIVATIVES', {})}
+
+
+def derivatives_are_current(field_file, derivatives):
+    """
+    True if the stored derivatives were generated from the file currently in the field.
+    """
+    name = field_file.name if field_file else None
+    return (derivatives or {}).get('source') == name or (not name and not derivatives)
+
+
+def render_derivatives(field_file, directory):
+    """
+    Generates fixed-size JPEG thumbnails and a tiny inline placeholder for an image.
+
+    Returns a dict with the storage name of every size, a `placeholder` data URI and
+    the `source` file name. Files that are not images get `{'source': ..., 'error': ...}`
+    so they are not retried.
+    """
+    options = get_image_derivative_settings()
+    storage = field_file.storage
+    source = field_file.name
+    derivatives = {'source': source}
+    digest = hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(source))[0]
+
+    try:
+        with storage.open(source, 'rb') as file:
+            image = Image.open(file)
+            image.load()
+    except (UnidentifiedImageError, OSError) as exc:
+        logger.warning("Could not create derivatives for %s: %s", source, exc)
+        derivatives['error'] = 'unsupported'
+        return derivatives
+
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    for size_name, size in options['SIZES'].items():
+        copy = image.copy()
+        copy.thumbnail(size)
+        name = storage.save(f'{directory}/{stem}-{digest}-{size_name}.jpg', ContentFile(_encode(copy, options['QUALITY'])))
+        derivatives[size_name] = name
+
+    placeholder = image.copy()
+    placeholder.thumbnail(options['PLACEHOLDER_SIZE'])
+    encoded = base64.b64encode(_encode(placeholder, 50)).decode('ascii')
+    derivatives['placeholder'] = f'data:image/jpeg;base64,{encoded}'
+    return derivatives
+
+
+def delete_derivatives(storage, derivatives):
+    """
+    Removes the derivative files listed in `derivatives` from storage.
+    """
+    sizes = get_image_derivative_settings()['SIZES']
+    for size_name in sizes:
+        name = (derivatives or {}).get(size_name)
+        if name and storage.exists(name):
+            storage.delete(name)
+
+
+def refresh_derivatives(model, pk, file_field, derivatives_field, directory):
+    """
+    Regenerates the derivatives of one row and removes the outdated ones.
+
+    Skips rows that were deleted or whose file changed again in the meantime.
+    The row is saved with `update_fields`, so regular post_save handlers
+    (e.g. cache invalidation) run.
+    """
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, file_field)
+    old_derivatives = getattr(instance, derivatives_field)
+    if derivatives_are_current(field_file, old_derivatives):
+        return
+
+    new_derivatives = render_derivatives(field_file, directory) if field_file else {}
+    delete_derivatives(field_file.storage, old_derivatives)
+    setattr(instance, derivatives_field, new_derivatives)
+    instance.save(update_fields=[derivatives_field])
+
+
+def schedule_derivatives(model, pk, file_field, derivatives_field, directory):
+    """
+    Runs `refresh_derivatives` after the current transaction commits, in a background
+    thread unless `IMAGE_DERIVATIVES['ASYNC']` is disabled.
+    """
+    def run():
+        try:
+            refresh_derivatives(model, pk, file_field, derivatives_field, directory)
+        except Exception:
+            logger.exception("Creating derivatives for %s %s failed", model.__name__, pk)
+        finally:
+            if options['ASYNC']:
+                connections.close_all()
+
+    options = get_image_derivative_settings()
+    if options['ASYNC']:
+        transaction.on_commit(lambda: _get_executor(options['WORKERS']).submit(run))
+    else:
+        transaction.on_commit(run)
+
+
+def derivative_urls(derivatives, storage, request=None):
+    """
+    Serializer helper: maps stored derivative names to URLs (absolute if a request is given).
+    """
+    if not derivatives or 'error' in derivatives:
+        return None
+    urls = {}
+    for size_name in get_image_derivative_settings()['SIZES']:
+        name = derivatives.get(size_name)
+        if name:
+            url = storage.url(name)
+            urls[size_name] = request.build_absolute_uri(url) if request is not None else url
+    urls['placeholder'] = derivatives.get('placeholder')
+    return urls
+
+
+def _encode(image, quality):
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def _get_executor(workers):
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-derivatives')
+    return _executor
@@ -0,0 +1,193 @@
+import json
+from base64 import b64decode, b64encode
+from datetime import datetime
+
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset ("seek") pagination shared by the list endpoints.
+
+    Pages are addressed by an opaque cursor that stores the ordering value and the
+    id of the last (or first) row of the current page. The next page is fetched with
+    `WHERE (field, id) > (value, id) ORDER BY field, id LIMIT n`, so neither a
+    `COUNT(*)` nor an `OFFSET` scan is needed and page N costs the same as page 1.
+
+    Ordering:
+    - The first ordering requested through `OrderingFilter` decides the keyset field.
+    - Only `ordering_fields` are accepted, everything else falls back to `default_ordering`.
+    - `id` is always appended as tie-breaker in the same direction.
+    - Nullable keyset fields sort NULL as the smallest value (first ascending, last
+      descending), and cursors positioned on a NULL value stay valid.
+    - Works on model querysets and on `values()` querysets that include the keyset field and `id`.
+
+    Response:
+    - `next`, `previous`: links carrying the `cursor` query parameter (or `None`).
+    - `results`: the serialized page.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = 6
+    page_size_query_param = 'page_size'
+    max_page_size = 6
+    ordering_fields = []
+    default_ordering = '-id'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_branches([queryset], request, view)
+
+    def paginate_branches(self, querysets, request, view=None):
+        """
+        Paginates the `UNION ALL` of several querysets of the same model.
+
+        The cursor position is applied to every branch before combining them, so each
+        branch can be answered from its own index (e.g. `(customer_user, created_at)`
+        and `(business_user, created_at)`) instead of one `OR` over both columns.
+        The branches must not overlap.
+        """
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.field, self.descending = self.get_ordering(request, querysets[0], view)
+        self.model_field = querysets[0].model._meta.get_field(self.field)
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor.get('r'))
+        descending = self.descending != reverse
+
+        if self.model_field.null:
+            field = F(self.field)
+            ordering = [field.desc(nulls_last=True), '-id'] if descending else [field.asc(nulls_first=True), 'id']
+        elif descending:
+            ordering = [f'-{self.field}', '-id']
+        else:
+            ordering = [self.field, 'id']
+
+        if cursor is not None:
+            position = self.get_position_filter(cursor['v'], cursor['id'], descending)
+            querysets = [queryset.filter(position) for queryset in querysets]
+
+        queryset = querysets[0]
+        if len(querysets) > 1:
+            queryset = queryset.union(*querysets[1:], all=True)
+        queryset = queryset.order_by(*ordering)
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next, self.has_previous = cursor is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Returns the keyset field and whether it is sorted descending.
+        """
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = [self.default_ordering]
+
+        field = ordering[0]
+        if field.lstrip('-') not in self.ordering_fields:
+            field = self.default_ordering
+        return field.lstrip('-'), field.startswith('-')
+
+    def get_position_filter(self, value, pk, descending):
+        """
+        Rows after `(value, pk)` in the page order; NULL counts as the smallest value.
+        """
+        lookup = 'lt' if descending else 'gt'
+        if value is None:
+            after = Q(**{f'{self.field}__isnull': True, f'id__{lookup}': pk})
+            return after if descending else after | Q(**{f'{self.field}__isnull': False})
+
+        after = Q(**{f'{self.field}__{lookup}': value}) | Q(**{self.field: value, f'id__{lookup}': pk})
+        if descending and self.model_field.null:
+            after |= Q(**{f'{self.field}__isnull': True})
+        return after
+
+    def get_position(self, instance):
+        if isinstance(instance, dict):
+            value, pk = instance[self.field], instance['id']
+        else:
+            value, pk = getattr(instance, self.field), instance.pk
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        return {'v': value, 'id': pk}
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            cursor['v'] = self.model_field.to_python(cursor['v'])
+            cursor['id'] = int(cursor['id'])
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, position, reverse=False):
+        if reverse:
+            position = dict(position, r=1)
+        encoded = b64encode(json.dumps(position, separators=(',', ':')).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
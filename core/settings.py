@@ -140,6 +140,59 @@ STATIC_ROOT = "/home/patrick_gogolin1996/projects/coderr_backend/staticfiles"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Response cache for the public offer list (see offers_app/cache.py).
+# Uses the default cache; configure a shared backend in CACHES when running several workers.
+OFFER_LIST_CACHE = {
+    'ENABLED': True,
+    'TIMEOUT': 300,
+    'SERVE_STALE': True,
+    'LOCK_TIMEOUT': 10,
+}
+
+# Per-offer cache of the rendered list representation ("offer card").
+# List pages are assembled from cards; only offers without a card are serialized.
+OFFER_CARD_CACHE = {
+    'ENABLED': True,
+    'TIMEOUT': 3600,
+}
+
+# Server-Sent Events for orders (see orders_app/events.py). Streams poll the OrderEvent
+# table every POLL_INTERVAL seconds and are woken up immediately for events of the same process.
+# Stream tokens (POST /api/orders/events/token/) open a stream for STREAM_TOKEN_MAX_AGE seconds.
+ORDER_EVENTS = {
+    'POLL_INTERVAL': 2,
+    'HEARTBEAT': 15,
+    'RETRY': 3000,
+    'RETENTION': 24 * 60 * 60,
+    'STREAM_TOKEN_MAX_AGE': 60,
+}
+
+# Snapshot of the /api/base-info/ statistics (see reviews_app/stats.py). Snapshots older than
+# MAX_AGE seconds are still served while one background thread recomputes them.
+BASE_INFO_CACHE = {
+    'ENABLED': True,
+    'MAX_AGE': 60,
+    'LOCK_TIMEOUT': 10,
+}
+
+# Archive tier for orders (see `python manage.py archive_orders`). Completed and cancelled
+# orders last updated more than AGE_DAYS ago are moved to ArchivedOrder in batches.
+ORDER_ARCHIVE = {
+    'AGE_DAYS': 180,
+    'BATCH_SIZE': 1000,
+}
+
+# Thumbnails and inline placeholders for Offer.image and UserProfile.file (see core/images.py).
+# Derivatives are generated after commit in a background thread; sizes are bounding boxes.
+IMAGE_DERIVATIVES = {
+    'ASYNC': True,
+    'WORKERS': 2,
+    'SIZES': {
+        'thumbnail': (480, 360),
+        'small': (120, 120),
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
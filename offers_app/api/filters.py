@@ -0,0 +1,107 @@
+from django.db import connections
+from django.db.models import Count, Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from offers_app.search import build_match_query, build_match_subquery, build_rank_subquery, is_search_index_enabled
+
+OFFER_FILTERS = {
+    'creator_id': 'user_id',
+    'min_price': 'min_price__gte',
+    'max_delivery_time': 'min_delivery_time__lte',
+}
+
+# Facet bands as (from, to) pairs: `from` inclusive, `to` exclusive, `None` = open end.
+OFFER_FACETS = {
+    'price': ('min_price', [(0, 50), (50, 100), (100, 250), (250, 500), (500, 1000), (1000, None)]),
+    'delivery_time': ('min_delivery_time', [(1, 2), (2, 4), (4, 8), (8, 15), (15, None)]),
+}
+
+
+def build_offer_filter(query_params):
+    """
+    Compiles the offer query parameters into a single `Q` on the offer table.
+
+    - `creator_id`: `user_id = value`
+    - `min_price`: stored `min_price >= value`
+    - `max_delivery_time`: stored `min_delivery_time <= value`
+
+    All conditions are plain column comparisons, so the resulting query needs no
+    join, aggregate or DISTINCT. Non-numeric values raise a `ValidationError`.
+    """
+    conditions = Q()
+    for param, lookup in OFFER_FILTERS.items():
+        value = query_params.get(param, None)
+        if not value:
+            continue
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({param: f"{param} has to be a number"})
+        conditions &= Q(**{lookup: value})
+    return conditions
+
+
+def get_offer_facets(queryset):
+    """
+    Counts the offers of `queryset` per band in `OFFER_FACETS`.
+
+    Bands read the stored `min_price` / `min_delivery_time` (the same columns the
+    filters use), and all counts are computed by one aggregate query with
+    filtered `COUNT`s. Returns `{'count': total, '<facet>': [{'from', 'to', 'count'}, ...]}`.
+    """
+    aggregates = {'count': Count('id')}
+    for facet, (field, bands) in OFFER_FACETS.items():
+        for index, (start, end) in enumerate(bands):
+            condition = Q(**{f'{field}__gte': start})
+            if end is not None:
+                condition &= Q(**{f'{field}__lt': end})
+            aggregates[f'{facet}_{index}'] = Count('id', filter=condition)
+
+    counts = queryset.order_by().aggregate(**aggregates)
+    facets = {'count': counts['count']}
+    for facet, (field, bands) in OFFER_FACETS.items():
+        facets[facet] = [
+            {'from': start, 'to': end, 'count': counts[f'{facet}_{index}']}
+            for index, (start, end) in enumerate(bands)
+        ]
+    return facets
+
+
+class OfferSearchFilter(filters.SearchFilter):
+    """
+    `search` filter for offers backed by the FTS5 index in `offers_app.search`.
+
+    Behavior:
+    - Every search term has to match the start of a word in the offer title,
+      description or one of the detail titles ("log" finds "Logo design", but not
+      "Blog"). This replaces the substring (`icontains`) match of DRF's `SearchFilter`.
+    - Without an explicit `ordering` parameter results are ranked by relevance (bm25).
+    - Falls back to DRF's `SearchFilter` (substring LIKE on `search_fields`) on non-SQLite databases.
+    """
+
+    def ranks_by_relevance(self, request, db):
+        """
+        True if the results for `request` are ordered by relevance instead of `ordering`.
+        """
+        return (
+            is_search_index_enabled(db)
+            and not request.query_params.get(filters.OrderingFilter.ordering_param)
+            and bool(build_match_query(self.get_search_terms(request)))
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        if not is_search_index_enabled(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        match_query = build_match_query(self.get_search_terms(request))
+        if not match_query:
+            return queryset
+
+        queryset = queryset.filter(id__in=RawSQL(*build_match_subquery(match_query)))
+        if self.ranks_by_relevance(request, queryset.db):
+            quote = connections[queryset.db].ops.quote_name
+            id_column = f'{quote(queryset.model._meta.db_table)}.{quote("id")}'
+            queryset = queryset.annotate(search_rank=RawSQL(*build_rank_subquery(match_query, id_column)))
+            queryset = queryset.order_by('search_rank', '-id')
+        return queryset
@@ -1,5 +1,9 @@
 from rest_framework import serializers
+from django.db import transaction
 from offers_app.models import Offer, OfferDetail
+from offers_app.search import index_offer
+from offers_app.bulk import bulk_create_offers
+from core.images import derivative_urls
 
 
 class OfferDetailSerializer(serializers.ModelSerializer):
@@ -13,15 +17,31 @@ class OfferDetailSerializer(serializers.ModelSerializer):
         model = OfferDetail
         exclude = ['offer']
 
+class OfferBulkCreateListSerializer(serializers.ListSerializer):
+    """
+    List serializer used by `OfferCreateSerializer(many=True)`.
+
+    Writes all validated offers with batched INSERTs in one transaction
+    instead of calling `OfferCreateSerializer.create` per item.
+    """
+
+    def create(self, validated_data):
+        request = self.context.get('request')
+        return bulk_create_offers(request.user, validated_data)
+
+
 class OfferCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for creating a new `Offer` along with multiple `OfferDetail` entries.
 
     Validations:
     - Requires at least 3 `OfferDetail` items.
+    - Each `offer_type` may only be used once.
 
     Fields:
     - `title`, `image`, `description`, `details`
+
+    With `many=True` the offers are created in bulk (`OfferBulkCreateListSerializer`).
     """
 
     details = OfferDetailSerializer(many=True)
@@ -31,19 +51,30 @@ class OfferCreateSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'image', 'description', 'details'
         ]
+        list_serializer_class = OfferBulkCreateListSerializer
     
     def validate(self, attrs):
         details = attrs.get('details', [])
         if len(details) < 3:
             raise serializers.ValidationError("Ein Offer muss mindestens 3 Details haben!")
+        offer_types = [detail['offer_type'] for detail in details]
+        if len(offer_types) != len(set(offer_types)):
+            raise serializers.ValidationError("Jeder offer_type darf nur einmal vorkommen!")
         return attrs
 
     def create(self, validated_data):
         request = self.context.get('request')
         details_data = validated_data.pop('details')
-        offer = Offer.objects.create(user=request.user, **validated_data)
-        for detail_data in details_data:
-            OfferDetail.objects.create(offer=offer, **detail_data)
+        with transaction.atomic():
+            offer = Offer.objects.create(
+                user=request.user,
+                min_price=min(detail['price'] for detail in details_data),
+                min_delivery_time=min(detail['delivery_time_in_days'] for detail in details_data),
+                **validated_data
+            )
+            for detail_data in details_data:
+                OfferDetail.objects.create(offer=offer, **detail_data)
+            index_offer(offer, [detail['title'] for detail in details_data])
         return offer
 
 
@@ -51,13 +82,13 @@ class OfferBaseSerializer(serializers.ModelSerializer):
     """
     Base serializer for `Offer` objects with computed fields:
     - `details`: List of detail links
-    - `min_price`: Minimum price from details
-    - `min_delivery_time`: Minimum delivery time from details
+    - `min_price`: Minimum price from details (stored on the offer)
+    - `min_delivery_time`: Minimum delivery time from details (stored on the offer)
     """
 
     details = serializers.SerializerMethodField()
-    min_price = serializers.SerializerMethodField()
-    min_delivery_time = serializers.SerializerMethodField()
+    min_price = serializers.IntegerField(read_only=True)
+    min_delivery_time = serializers.IntegerField(read_only=True)
 
     def get_details(self, obj):
         result = []
@@ -69,14 +100,6 @@ class OfferBaseSerializer(serializers.ModelSerializer):
             result.append(item)
         return result
 
-    def get_min_price(self, obj):
-        prices = obj.details.values_list('price', flat=True)
-        return min(prices) if prices else None
-
-    def get_min_delivery_time(self, obj):
-        times = obj.details.values_list('delivery_time_in_days', flat=True)
-        return min(times) if times else None
-
 
 class OfferListSerializer(OfferBaseSerializer):
     """
@@ -84,17 +107,23 @@ class OfferListSerializer(OfferBaseSerializer):
 
     Includes:
     - `user_details`: Basic information about the offer creator
+    - `image_derivatives`: Thumbnail URLs and an inline placeholder for the image
+      (`None` until they are generated); list views should use these instead of `image`
     - Aggregated and computed fields from `OfferBaseSerializer`
     """
 
     user_details = serializers.SerializerMethodField()
+    image_derivatives = serializers.SerializerMethodField()
 
     class Meta:
         model = Offer
         fields = [
-            'id', 'user', 'title', 'image', 'description', 'created_at', 'updated_at', 'details', 'min_price', 'min_delivery_time', 'user_details'
+            'id', 'user', 'title', 'image', 'image_derivatives', 'description', 'created_at', 'updated_at', 'details', 'min_price', 'min_delivery_time', 'user_details'
         ]
 
+    def get_image_derivatives(self, obj):
+        return derivative_urls(obj.image_derivatives, obj.image.storage, self.context.get('request'))
+
     def get_user_details(self, obj):
         return {
             "first_name": obj.user.first_name,
@@ -135,6 +164,13 @@ class OfferUpdateSerializer(serializers.ModelSerializer):
     - Updates offer fields if provided.
     - For each detail, updates it based on the unique `offer_type`.
     - Raises error if a provided `offer_type` does not match any existing detail.
+    - Recalculates the stored `min_price` and `min_delivery_time` after detail changes.
+    - Re-indexes the offer for search when searchable text changed.
+
+    Writes:
+    - Only changed fields are written (`update_fields` on the offer, one `bulk_update`
+      for all changed details), all inside a single transaction.
+    - A PATCH that changes nothing does not write to the database.
     """
     details = OfferDetailPartialUpdateSerializer(many=True, required=False)
 
@@ -149,27 +185,49 @@ class OfferUpdateSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         details_data = validated_data.pop('details', None)
-
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-
-        if details_data is not None:
-    
-            existing_details = {}
-            for detail in instance.details.all():
-                existing_details[detail.offer_type] = detail
-                
-            for detail in details_data:
-                offer_type = detail.get('offer_type')
-                if offer_type in existing_details:
+        update_fields = set()
+        changed_detail_fields = set()
+        existing_details = None
+
+        with transaction.atomic():
+            for attr, value in validated_data.items():
+                if getattr(instance, attr) != value:
+                    setattr(instance, attr, value)
+                    update_fields.add(attr)
+
+            if details_data:
+                existing_details = {}
+                for detail in instance.details.all():
+                    existing_details[detail.offer_type] = detail
+
+                changed_details = {}
+                for detail in details_data:
+                    offer_type = detail.get('offer_type')
+                    if offer_type not in existing_details:
+                        raise serializers.ValidationError(
+                            f"Detail mit offer_type '{offer_type}' nicht gefunden."
+                        )
                     detail_instance = existing_details[offer_type]
                     for attr, value in detail.items():
-                        setattr(detail_instance, attr, value)
-                    detail_instance.save()
-                else:
-                    raise serializers.ValidationError(
-                        f"Detail mit offer_type '{offer_type}' nicht gefunden."
-                    )
+                        if getattr(detail_instance, attr) != value:
+                            setattr(detail_instance, attr, value)
+                            changed_detail_fields.add(attr)
+                            changed_details[offer_type] = detail_instance
+
+                if changed_details:
+                    OfferDetail.objects.bulk_update(changed_details.values(), sorted(changed_detail_fields))
+                    if changed_detail_fields & {'price', 'delivery_time_in_days'}:
+                        instance.refresh_min_values(details=existing_details.values(), save=False)
+                        update_fields |= {'min_price', 'min_delivery_time'}
+
+            if not update_fields and not changed_detail_fields:
+                return instance
+
+            instance.save(update_fields=sorted(update_fields | {'updated_at'}))
+
+            if 'title' in changed_detail_fields:
+                index_offer(instance, [detail.title for detail in existing_details.values()])
+            elif update_fields & {'title', 'description'}:
+                index_offer(instance)
 
         return instance
\ No newline at end of file
@@ -1,14 +1,25 @@
+from functools import partial
 from rest_framework import generics
 from rest_framework import filters
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.decorators import action
+from rest_framework import status
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.exceptions import ValidationError, PermissionDenied
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Min
+from django.db.models import Prefetch
 from offers_app.models import Offer, OfferDetail
+from core.pagination import KeysetCursorPagination
+from core.conditional import ConditionalGetMixin, make_etag
 
 from offers_app.api.permissions import OfferPermission
+from offers_app.api.filters import OfferSearchFilter, build_offer_filter, get_offer_facets
+from offers_app.cache import (
+    build_list_cache_key, get_cached_list, get_card_cache_settings, get_catalog_version, get_list_cache_settings,
+    get_offer_cards, release_list_lock, set_cached_list, set_offer_cards
+)
 from offers_app.api.serializers import OfferCreateSerializer, OfferListSerializer, OfferWithDetailsSerializer, OfferUpdateSerializer, OfferDetailSerializer
 
 
@@ -23,43 +34,84 @@ class LargeResultsSetPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 6
 
-class OfferViewSet(ModelViewSet):
+
+class OfferCursorPagination(KeysetCursorPagination):
+    """
+    Cursor based pagination for the offer list (`?pagination=cursor`).
+
+    - Keyset on `updated_at` or `min_price`, with `id` as tie-breaker.
+    - Same page size limits as `LargeResultsSetPagination` (max 6).
+    - No `count` in the response; follow the `next` / `previous` links instead.
+    """
+    page_size = 6
+    page_size_query_param = 'page_size'
+    max_page_size = 6
+    ordering_fields = ['updated_at', 'min_price']
+    default_ordering = 'updated_at'
+
+class OfferViewSet(ConditionalGetMixin, ModelViewSet):
     """
     ViewSet for managing offers.
 
     Permissions:
-    - `list`: Public access (no authentication required).
+    - `list`, `facets`: Public access (no authentication required).
     - `retrieve`: Requires authentication.
-    - `create`, `update`, `partial_update`, `destroy`: Requires authentication and `OfferPermission`.
+    - `create`, `bulk_create`, `update`, `partial_update`, `destroy`: Requires authentication and `OfferPermission`.
 
     Filtering & Ordering:
-    - Supports full-text search on `title` and `description`.
+    - Supports full-text search on `title`, `description` and detail titles (`OfferSearchFilter`),
+      ranked by relevance unless `ordering` is given.
     - Can be filtered by `creator_id`, `min_price`, and `max_delivery_time`.
-    - Ordering fields include `updated_at` and dynamically annotated `min_price`.
+    - Ordering fields include `updated_at` and the stored `min_price`.
+    - `GET /offers/facets/` returns price and delivery time band counts for the same
+      filter / search parameters (one aggregate query, cached like `list`).
 
     Pagination:
     - Uses `LargeResultsSetPagination` (6 items per page).
+    - `?pagination=cursor` (or a `cursor` from a previous response) switches to `OfferCursorPagination`.
+
+    Caching:
+    - `list` responses are cached per normalized query string and invalidated by the
+      catalog version (see `offers_app.cache`).
+    - On a list cache miss the page is assembled from per-offer cards (the cached
+      `OfferListSerializer` output); only offers without a card are loaded and serialized.
+    - `retrieve` supports conditional GET (ETag / Last-Modified based on `updated_at`).
 
     Serializers:
     - `create`: Uses `OfferCreateSerializer`
+    - `bulk_create` (`POST /offers/bulk/`): Uses `OfferCreateSerializer(many=True)`
     - `retrieve`: Uses `OfferWithDetailsSerializer`
     - `update`, `partial_update`: Uses `OfferUpdateSerializer`
     - `list`: Uses `OfferListSerializer`
     """
 
     queryset = Offer.objects.all()
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, OfferSearchFilter]
     search_fields = ['title', 'description']
     ordering_fields = ['updated_at', 'min_price']
     ordering = ['updated_at']
     pagination_class = LargeResultsSetPagination
+    max_bulk_offers = 1000
 
     def get_permissions(self):
         if self.action == 'retrieve':
             return [IsAuthenticated()]
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'bulk_create', 'update', 'partial_update', 'destroy']:
             return [IsAuthenticated(), OfferPermission()]
         return []
+
+    @property
+    def paginator(self):
+        """
+        Selects cursor pagination when requested, page numbers otherwise.
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = OfferCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
     
     def get_queryset(self):
         """
@@ -68,38 +120,32 @@ class OfferViewSet(ModelViewSet):
         - `min_price`: minimum price in details
         - `max_delivery_time`: maximum delivery time in details
 
-        Also annotates:
-        - `min_price`: minimum price from related offer details
+        The filters are compiled into one WHERE clause by `build_offer_filter`; price
+        and delivery time read the stored `min_price` and `min_delivery_time` columns
+        instead of aggregating the details.
+
+        For `list` and `retrieve` the creator and the detail ids are loaded up front,
+        so the number of queries does not grow with the page size.
         """
 
         queryset = Offer.objects.all()
 
-        queryset = queryset.annotate(min_price=Min('details__price'))
-
-        creator_id = self.request.query_params.get('creator_id', None)
-        if creator_id:
-            queryset = queryset.filter(user_id=creator_id)
-        
-        min_price_param = self.request.query_params.get('min_price', None)
-        if min_price_param:
-            queryset = queryset.annotate(min_detail_price=Min('details__price')).filter(min_detail_price__gte=min_price_param)
-        
-        max_delivery_time_param = self.request.query_params.get('max_delivery_time', None)
-        if max_delivery_time_param:
-            try:
-                max_delivery_time_val = int(max_delivery_time_param)
-            except:
-                raise ValidationError({"max_delivery_time": "max_delivery_time has to be a number"})
-            queryset = queryset.annotate(min_delivery=Min('details__delivery_time_in_days')).filter(min_delivery__lte=max_delivery_time_val)
-        
-        return queryset.distinct()
+        if self.action in ['list', 'retrieve']:
+            queryset = self.with_related(queryset)
+
+        return queryset.filter(build_offer_filter(self.request.query_params))
+
+    def with_related(self, queryset):
+        return queryset.select_related('user').prefetch_related(
+            Prefetch('details', queryset=OfferDetail.objects.only('id', 'offer_id').order_by('id'))
+        )
 
     def get_serializer_class(self):
         """
         Dynamically selects the appropriate serializer class based on the action.
         """
 
-        if self.action == 'create':
+        if self.action in ['create', 'bulk_create']:
             return OfferCreateSerializer
         elif self.action in ['update', 'partial_update']:
             return OfferUpdateSerializer
@@ -107,16 +153,153 @@ class OfferViewSet(ModelViewSet):
             return OfferWithDetailsSerializer
         return OfferListSerializer
 
-    
+    def list(self, request, *args, **kwargs):
+        """
+        Serves the list from the versioned response cache (`offers_app.cache`).
+
+        The key is built from the normalized query parameters and the ordering that is
+        actually applied (`relevance` for a search without `ordering`). Entries are tied
+        to the catalog version, which every offer or detail write moves forward. The
+        `X-Cache` header reports `hit`, `stale` or `miss`.
+        """
+        if not get_list_cache_settings()['ENABLED']:
+            return self.list_from_cards(request, *args, **kwargs)
 
-class OfferDetails(generics.RetrieveAPIView):
+        ordering = 'relevance' if OfferSearchFilter().ranks_by_relevance(request, Offer.objects.db) else self.ordering[0]
+        key = build_list_cache_key(
+            request,
+            defaults={'page': 1, 'ordering': ordering},
+            overrides={'page_size': self.paginator.get_page_size(request)}
+        )
+        data, state = get_cached_list(key)
+        if data is not None:
+            response = Response(data)
+        else:
+            version = get_catalog_version()
+            try:
+                response = self.list_from_cards(request, *args, **kwargs)
+                if response.status_code == 200:
+                    set_cached_list(key, response.data, version)
+            finally:
+                release_list_lock(key)
+        response['X-Cache'] = state
+        return response
+
+    def list_from_cards(self, request, *args, **kwargs):
+        """
+        Builds a list page from cached offer cards (`offers_app.cache.get_offer_cards`).
+
+        The page itself is selected on plain `values()` rows (id and the keyset
+        fields), so cached offers are never instantiated. Offers without a card are
+        loaded in one query, serialized with `OfferListSerializer` and stored as cards.
+        Cards are matched against the page rows' `updated_at`, so an outdated card
+        is re-serialized instead of served.
+        """
+        if not get_card_cache_settings()['ENABLED']:
+            return super().list(request, *args, **kwargs)
+
+        rows = self.filter_queryset(self.get_queryset()).select_related(None).prefetch_related(None)
+        page = self.paginate_queryset(rows.values('id', 'updated_at', 'min_price'))
+        ids = [row['id'] for row in page]
+
+        origin = f'{request.scheme}://{request.get_host()}'
+        cards = get_offer_cards({row['id']: row['updated_at'] for row in page}, origin)
+        missing = [pk for pk in ids if pk not in cards]
+        if missing:
+            offers = list(self.with_related(Offer.objects.filter(pk__in=missing)))
+            fresh = {item['id']: item for item in self.get_serializer(offers, many=True).data}
+            set_offer_cards(fresh, origin, {offer.pk: offer.updated_at for offer in offers})
+            cards.update(fresh)
+
+        return self.get_paginated_response([cards[pk] for pk in ids if pk in cards])
+
+
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request):
+        """
+        Returns the offer counts per price and delivery time band for the current
+        filters and search (`offers_app.api.filters.get_offer_facets`).
+        """
+        use_cache = get_list_cache_settings()['ENABLED']
+        if use_cache:
+            key = build_list_cache_key(request, defaults={}, namespace='facets')
+            data, state = get_cached_list(key)
+            if data is not None:
+                response = Response(data)
+                response['X-Cache'] = state
+                return response
+            version = get_catalog_version()
+
+        try:
+            queryset = OfferSearchFilter().filter_queryset(request, self.get_queryset(), self)
+            data = get_offer_facets(queryset)
+            if use_cache:
+                set_cached_list(key, data, version)
+        finally:
+            if use_cache:
+                release_list_lock(key)
+        response = Response(data)
+        if use_cache:
+            response['X-Cache'] = state
+        return response
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        """
+        Creates many offers in one request (`POST /api/offers/bulk/`).
+
+        Expects a JSON list of offer payloads in the same format as `create`.
+        All offers are validated first; nothing is written if one is invalid.
+        Returns the number and ids of the created offers.
+        """
+        if not isinstance(request.data, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of offers."]})
+        if not request.data:
+            raise ValidationError({"non_field_errors": ["The list of offers must not be empty."]})
+        if len(request.data) > self.max_bulk_offers:
+            raise ValidationError({"non_field_errors": [f"At most {self.max_bulk_offers} offers per request."]})
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        offers = serializer.save()
+        return Response({
+            'count': len(offers),
+            'ids': [offer.id for offer in offers]
+        }, status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Answers 304 Not Modified from the offer's `updated_at` before loading
+        and serializing the offer.
+        """
+        pk = kwargs.get(self.lookup_field)
+        updated_at = Offer.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = make_etag('offer', pk, updated_at.isoformat())
+        return self.conditional_get(request, etag, updated_at, partial(super().retrieve, request, *args, **kwargs))
+
+
+class OfferDetails(ConditionalGetMixin, generics.RetrieveAPIView):
     """
     RetrieveAPIView for a single OfferDetail instance.
 
     - Requires authentication (`IsAuthenticated`).
     - Uses `OfferDetailSerializer` for representation.
+    - Supports conditional GET; details change together with their offer,
+      so the offer's `updated_at` is used as validator.
     """
     
     queryset = OfferDetail.objects.all()
     permission_classes = [IsAuthenticated]
-    serializer_class = OfferDetailSerializer
\ No newline at end of file
+    serializer_class = OfferDetailSerializer
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs.get(self.lookup_field)
+        updated_at = OfferDetail.objects.filter(pk=pk).values_list('offer__updated_at', flat=True).first()
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = make_etag('offerdetail', pk, updated_at.isoformat())
+        return self.conditional_get(request, etag, updated_at, partial(super().retrieve, request, *args, **kwargs))
\ No newline at end of file
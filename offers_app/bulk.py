@@ -0,0 +1,48 @@
+from django.db import transaction
+from offers_app.models import Offer, OfferDetail
+from offers_app.search import index_offers
+from offers_app.cache import invalidate_catalog
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def bulk_create_offers(user, offers_data, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Creates many offers with their details using batched INSERTs in one transaction.
+
+    `offers_data` are validated `OfferCreateSerializer` payloads (at least 3 details each).
+    The stored min values and the search index are filled in the same pass; since
+    `bulk_create` sends no signals, the catalog version is bumped once at the end.
+
+    Returns the created `Offer` instances (with primary keys).
+    """
+    created = []
+    with transaction.atomic():
+        for start in range(0, len(offers_data), batch_size):
+            chunk = offers_data[start:start + batch_size]
+
+            offers = []
+            for data in chunk:
+                fields = {key: value for key, value in data.items() if key != 'details'}
+                offers.append(Offer(
+                    user=user,
+                    min_price=min(detail['price'] for detail in data['details']),
+                    min_delivery_time=min(detail['delivery_time_in_days'] for detail in data['details']),
+                    **fields
+                ))
+            Offer.objects.bulk_create(offers)
+
+            details = []
+            for offer, data in zip(offers, chunk):
+                for detail_data in data['details']:
+                    details.append(OfferDetail(offer=offer, **detail_data))
+            OfferDetail.objects.bulk_create(details, batch_size=batch_size)
+
+            index_offers(
+                (offer.pk, offer.title, offer.description, [detail['title'] for detail in data['details']])
+                for offer, data in zip(offers, chunk)
+            )
+            created.extend(offers)
+
+        invalidate_catalog()
+    return created
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+CATALOG_VERSION_KEY = 'offers:catalog_version'
+LIST_ENTRY_KEY = 'offers:list:{}'
+LIST_LOCK_KEY = 'offers:list:{}:lock'
+STATS_KEY = 'offers:list:stats:{}'
+STATS_COUNTERS = ['hit', 'stale', 'miss']
+CARD_KEY = 'offers:card:{}'
+CARD_STATS_COUNTERS = ['card_hit', 'card_miss']
+
+DEFAULT_LIST_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'TIMEOUT': 300,
+    'SERVE_STALE': True,
+    'LOCK_TIMEOUT': 10,
+}
+
+DEFAULT_CARD_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'TIMEOUT': 3600,
+}
+
+
+def get_list_cache_settings():
+    """
+    Returns `settings.OFFER_LIST_CACHE` merged over the defaults.
+    """
+    return {**DEFAULT_LIST_CACHE_SETTINGS, **getattr(settings, 'OFFER_LIST_CACHE', {})}
+
+
+def get_card_cache_settings():
+    """
+    Returns `settings.OFFER_CARD_CACHE` merged over the defaults.
+    """
+    return {**DEFAULT_CARD_CACHE_SETTINGS, **getattr(settings, 'OFFER_CARD_CACHE', {})}
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version():
+    """
+    Invalidates every cached offer list by moving the global catalog version forward.
+    """
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        return cache.incr(CATALOG_VERSION_KEY)
+
+
+def invalidate_catalog():
+    """
+    Bumps the catalog version now and, inside a transaction, again on commit,
+    so a list that was rendered from the not yet committed state is not kept as fresh.
+    """
+    bump_catalog_version()
+    if connection.in_atomic_block:
+        transaction.on_commit(bump_catalog_version)
+
+
+def normalize_query_params(query_params, defaults, overrides=None):
+    """
+    Builds a stable cache key part from the query parameters.
+
+    Empty values are dropped, `defaults` fill in missing parameters, `overrides`
+    replace given ones (e.g. a clamped page size) and everything is sorted,
+    so `?page=1&ordering=updated_at` and `?ordering=updated_at` are the same key.
+    """
+    params = {}
+    for key, values in query_params.lists():
+        values = sorted(value for value in values if value != '')
+        if values:
+            params[key] = values
+    for key, value in defaults.items():
+        params.setdefault(key, [str(value)])
+    for key, value in (overrides or {}).items():
+        params[key] = [str(value)]
+    return sorted(params.items())
+
+
+def build_list_cache_key(request, defaults, overrides=None, namespace='list'):
+    params = normalize_query_params(request.query_params, defaults, overrides)
+    raw = json.dumps([namespace, request.scheme, request.get_host(), params], separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def get_cached_list(key):
+    """
+    Looks up a cached list response.
+
+    Returns `(data, state)` where `state` is `'hit'`, `'stale'` or `'miss'`.
+    A stale entry is only served while another request holds the refresh lock;
+    the request that takes the lock gets a miss and is expected to call `set_cached_list`.
+    """
+    options = get_list_cache_settings()
+    entry = cache.get(LIST_ENTRY_KEY.format(key))
+    version = get_catalog_version()
+
+    if entry is not None and entry['version'] == version:
+        _count('hit')
+        return entry['data'], 'hit'
+
+    if entry is not None and options['SERVE_STALE']:
+        if not cache.add(LIST_LOCK_KEY.format(key), 1, timeout=options['LOCK_TIMEOUT']):
+            _count('stale')
+            return entry['data'], 'stale'
+
+    _count('miss')
+    return None, 'miss'
+
+
+def set_cached_list(key, data, version):
+    """
+    Stores a rendered list for the catalog version it was computed against
+    and releases the refresh lock.
+    """
+    options = get_list_cache_settings()
+    cache.set(
+        LIST_ENTRY_KEY.format(key),
+        {'version': version, 'data': data, 'created': time.time()},
+        timeout=options['TIMEOUT']
+    )
+    release_list_lock(key)
+
+
+def release_list_lock(key):
+    """
+    Releases the refresh lock of a list entry, also when rendering it failed.
+    """
+    cache.delete(LIST_LOCK_KEY.format(key))
+
+
+def get_list_cache_stats():
+    stats = {name: cache.get(STATS_KEY.format(name), 0) for name in STATS_COUNTERS}
+    total = sum(stats.values())
+    stats['hit_ratio'] = (stats['hit'] + stats['stale']) / total if total else 0
+    return stats
+
+
+def reset_list_cache_stats():
+    cache.delete_many([STATS_KEY.format(name) for name in STATS_COUNTERS])
+
+
+def get_offer_cards(versions, origin):
+    """
+    Returns the cached list representations ("offer cards") of the given offers
+    as `{id: data}`; `versions` maps each offer id to its current `updated_at`.
+
+    Cards contain absolute URLs, so they are stored per `scheme://host`. Every card
+    is stamped with the `updated_at` it was serialized from; a card whose stamp
+    differs from `versions` (e.g. written back by a request that loaded the offer
+    just before an update) counts as a miss.
+    """
+    keys = {pk: CARD_KEY.format(pk) for pk in versions}
+    entries = cache.get_many(list(keys.values()))
+    cards = {}
+    for pk, key in keys.items():
+        stamp, card = entries.get(key, {}).get(origin, (None, None))
+        if card is not None and stamp == versions[pk]:
+            cards[pk] = card
+    _count('card_hit', len(cards))
+    _count('card_miss', len(keys) - len(cards))
+    return cards
+
+
+def set_offer_cards(cards, origin, versions):
+    """
+    Stores freshly serialized offer cards (`{id: data}`) for `origin`, stamped
+    with the `updated_at` of the instances they were serialized from (`versions`).
+    """
+    keys = {pk: CARD_KEY.format(pk) for pk in cards}
+    entries = cache.get_many(list(keys.values()))
+    cache.set_many(
+        {key: {**entries.get(key, {}), origin: (versions[pk], cards[pk])} for pk, key in keys.items()},
+        timeout=get_card_cache_settings()['TIMEOUT']
+    )
+
+
+def invalidate_offer_cards(ids):
+    """
+    Drops the cards of the given offers now and, inside a transaction, again on commit
+    (same reasoning as `invalidate_catalog`).
+    """
+    keys = [CARD_KEY.format(pk) for pk in ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def get_card_cache_stats():
+    stats = {name: cache.get(STATS_KEY.format(name), 0) for name in CARD_STATS_COUNTERS}
+    total = stats['card_hit'] + stats['card_miss']
+    stats['card_hit_ratio'] = stats['card_hit'] / total if total else 0
+    return stats
+
+
+def reset_card_cache_stats():
+    cache.delete_many([STATS_KEY.format(name) for name in CARD_STATS_COUNTERS])
+
+
+def _count(name, amount=1):
+    if not amount:
+        return
+    key = STATS_KEY.format(name)
+    if not cache.add(key, amount, timeout=None):
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            cache.set(key, amount, timeout=None)
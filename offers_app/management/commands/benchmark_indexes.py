@@ -0,0 +1,151 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Min
+from offers_app.models import Offer, OfferDetail
+from orders_app.models import Order
+from reviews_app.models import Review
+from user_auth_app.models import UserProfile
+
+INDEXED_MODELS = [Offer, OfferDetail, Order, Review, UserProfile]
+
+
+class Command(BaseCommand):
+    """
+    Shows the query plan and latency of the hot endpoint queries with and without
+    the composite indexes declared in the model `Meta.indexes`.
+
+    Everything runs inside one transaction that is rolled back at the end: synthetic
+    data is inserted, each query is measured, the indexes are dropped, each query
+    is measured again. The database is left unchanged.
+    """
+
+    help = "Benchmarks the endpoint queries with and without the composite indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--businesses', type=int, default=200)
+        parser.add_argument('--customers', type=int, default=1000)
+        parser.add_argument('--offers-per-business', type=int, default=10)
+        parser.add_argument('--orders', type=int, default=20000)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        random.seed(0)
+        with transaction.atomic():
+            business_ids, customer_ids, offer_ids = self.seed(options)
+            cases = self.get_cases(business_ids[0], customer_ids[0], offer_ids[0])
+
+            with_indexes = {name: self.measure(queryset, options['repeat'], 'with') for name, queryset in cases}
+            self.drop_indexes()
+            without_indexes = {name: self.measure(queryset, options['repeat'], 'without') for name, queryset in cases}
+
+            for name, _ in cases:
+                before, after = without_indexes[name], with_indexes[name]
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.stdout.write(f"  without indexes: {before['ms']:.3f} ms")
+                for line in before['plan']:
+                    self.stdout.write(f"    {line}")
+                self.stdout.write(f"  with indexes:    {after['ms']:.3f} ms")
+                for line in after['plan']:
+                    self.stdout.write(f"    {line}")
+
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        """
+        Inserts users, profiles, offers, details, orders and reviews with `bulk_create`.
+        """
+        suffix = int(time.time())
+        users = User.objects.bulk_create(
+            [User(username=f'bench-business-{suffix}-{i}') for i in range(options['businesses'])]
+            + [User(username=f'bench-customer-{suffix}-{i}') for i in range(options['customers'])]
+        )
+        businesses, customers = users[:options['businesses']], users[options['businesses']:]
+        UserProfile.objects.bulk_create(
+            [UserProfile(user=user, type='business') for user in businesses]
+            + [UserProfile(user=user, type='customer') for user in customers],
+            ignore_conflicts=True
+        )
+
+        offers = Offer.objects.bulk_create([
+            Offer(user=user, title=f'Offer {i}', description='Benchmark', min_price=50, min_delivery_time=3)
+            for user in businesses for i in range(options['offers_per_business'])
+        ])
+        details = OfferDetail.objects.bulk_create([
+            OfferDetail(
+                offer=offer, title=offer_type, revisions=1, features=[], offer_type=offer_type,
+                price=random.randint(10, 1000), delivery_time_in_days=random.randint(1, 30)
+            )
+            for offer in offers for offer_type in ['basic', 'standard', 'premium']
+        ], batch_size=1000)
+
+        statuses = [choice for choice, _ in Order.STATUS_CHOICES]
+        Order.objects.bulk_create([
+            Order(
+                customer_user=random.choice(customers), business_user=detail.offer.user, offer_detail=detail,
+                title=detail.title, revisions=1, delivery_time_in_days=detail.delivery_time_in_days,
+                price=detail.price, features=[], offer_type=detail.offer_type, status=random.choice(statuses)
+            )
+            for detail in random.choices(details, k=options['orders'])
+        ], batch_size=1000)
+        Review.objects.bulk_create([
+            Review(business_user=random.choice(businesses), reviewer=random.choice(customers),
+                   rating=random.randint(1, 5), description='Benchmark')
+            for _ in range(options['reviews'])
+        ], batch_size=1000)
+
+        return [user.pk for user in businesses], [user.pk for user in customers], [offer.pk for offer in offers]
+
+    def get_cases(self, business_id, customer_id, offer_id):
+        """
+        One queryset per endpoint, shaped like the query the endpoint sends.
+        """
+        details = OfferDetail.objects.filter(offer_id=offer_id)
+        return [
+            ('GET /api/offers/?creator_id=', Offer.objects.filter(user_id=business_id).order_by('updated_at')[:6]),
+            ('offer min price', details.values('offer_id').annotate(value=Min('price')).values('value')),
+            ('offer min delivery time',
+             details.values('offer_id').annotate(value=Min('delivery_time_in_days')).values('value')),
+            ('GET /api/order-count/{id}/',
+             Order.objects.filter(business_user_id=business_id, status='in_progress').values('id')),
+            ('GET /api/orders/ (customer)', Order.objects.filter(customer_user_id=customer_id).order_by('-created_at')),
+            ('GET /api/reviews/?business_user_id=',
+             Review.objects.filter(business_user_id=business_id).order_by('-updated_at')),
+            ('GET /api/reviews/?reviewer_id=', Review.objects.filter(reviewer_id=customer_id).order_by('-updated_at')),
+            ('GET /api/reviews/?business_user_id=&ordering=-rating&pagination=cursor',
+             Review.objects.filter(business_user_id=business_id).order_by('-rating', '-id')[:21]),
+            ('GET /api/reviews/?ordering=rating&pagination=cursor', Review.objects.order_by('rating', 'id')[:21]),
+            ('GET /api/profiles/business/', UserProfile.objects.filter(type='business')),
+        ]
+
+    def measure(self, queryset, repeat, label):
+        """
+        Returns the plan and the median latency of the queryset's SQL.
+
+        The SQL is prefixed with a `label` comment, so statements prepared before the
+        indexes were dropped are not reused from the driver's statement cache.
+        """
+        sql, params = queryset.query.sql_with_params()
+        sql = f'/* {label} */ {sql}'
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_prefix} {sql}', params)
+            plan = [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                cursor.execute(sql, params)
+                cursor.fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+        return {'plan': plan, 'ms': statistics.median(timings)}
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
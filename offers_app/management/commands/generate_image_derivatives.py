@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from core.images import derivatives_are_current, refresh_derivatives
+from offers_app.models import Offer
+from user_auth_app.models import UserProfile
+
+TARGETS = [
+    (Offer, 'image', 'image_derivatives', 'uploads/derivatives/offers/{}'),
+    (UserProfile, 'file', 'file_derivatives', 'uploads/derivatives/profiles/{}'),
+]
+
+
+class Command(BaseCommand):
+    """
+    Generates missing or outdated thumbnails and placeholders for offer images
+    and profile files in the foreground. Intended for backfills.
+    """
+
+    help = "Generates missing image derivatives for offers and profiles."
+
+    def handle(self, *args, **options):
+        for model, file_field, derivatives_field, directory in TARGETS:
+            refreshed = 0
+            rows = model.objects.exclude(**{file_field: ''}).exclude(**{f'{file_field}__isnull': True})
+            for instance in rows.only('pk', file_field, derivatives_field).iterator():
+                if derivatives_are_current(getattr(instance, file_field), getattr(instance, derivatives_field)):
+                    continue
+                refresh_derivatives(model, instance.pk, file_field, derivatives_field, directory.format(instance.pk))
+                refreshed += 1
+            self.stdout.write(f"{model.__name__}: refreshed {refreshed}")
@@ -0,0 +1,135 @@
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from offers_app.bulk import DEFAULT_BATCH_SIZE, bulk_create_offers
+from user_auth_app.lookup import get_business_user
+
+OFFER_TYPES = ['basic', 'standard', 'premium']
+DETAIL_FIELDS = ['title', 'revisions', 'delivery_time_in_days', 'price', 'features']
+
+
+def csv_row_to_offer(row):
+    """
+    Converts a flat CSV row into an offer payload.
+
+    Columns: `title`, `description` and per offer type `<type>_title`, `<type>_revisions`,
+    `<type>_delivery_time_in_days`, `<type>_price`, `<type>_features`. Features are a
+    JSON list or values separated by `|`. Offer types without a title are skipped.
+    """
+    details = []
+    for offer_type in OFFER_TYPES:
+        if not row.get(f'{offer_type}_title'):
+            continue
+        detail = {field: row.get(f'{offer_type}_{field}') for field in DETAIL_FIELDS}
+        features = (detail['features'] or '').strip()
+        if features.startswith('['):
+            detail['features'] = json.loads(features)
+        else:
+            detail['features'] = [feature.strip() for feature in features.split('|') if feature.strip()]
+        detail['offer_type'] = offer_type
+        details.append(detail)
+    return {'title': row.get('title'), 'description': row.get('description'), 'details': details}
+
+
+def init_worker():
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def validate_chunk(file_format, records):
+    """
+    Parses and validates a chunk of `(line_number, record)` pairs in a worker process.
+
+    Returns `(valid, errors)` where `valid` holds validated payloads and `errors`
+    holds `(line_number, errors)` pairs. Does not touch the database.
+    """
+    from offers_app.api.serializers import OfferCreateSerializer
+
+    valid, errors = [], []
+    for line_number, record in records:
+        try:
+            payload = json.loads(record) if file_format == 'ndjson' else csv_row_to_offer(record)
+        except ValueError as exc:
+            errors.append((line_number, str(exc)))
+            continue
+        serializer = OfferCreateSerializer(data=payload)
+        if serializer.is_valid():
+            valid.append(serializer.validated_data)
+        else:
+            errors.append((line_number, serializer.errors))
+    return valid, errors
+
+
+class Command(BaseCommand):
+    """
+    Imports offers for one business user from a CSV or NDJSON file.
+
+    Parsing and validation (same rules as the API, at least 3 details) run in a
+    process pool; each validated chunk is written with batched INSERTs in its own
+    transaction. Invalid records are skipped and reported with their line number.
+    """
+
+    help = "Imports offers from a CSV or NDJSON file for a business user."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help="Username or id of the business user.")
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help="Defaults to the file extension.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        user = get_business_user(options['user'])
+        file_format = options['format'] or ('csv' if options['path'].endswith('.csv') else 'ndjson')
+        workers = max(options['workers'], 1)
+
+        created = 0
+        invalid = 0
+        with open(options['path'], newline='', encoding='utf-8') as file:
+            chunks = self.read_chunks(file, file_format, options['chunk_size'])
+            for valid, errors in self.validate_chunks(chunks, file_format, workers):
+                for line_number, error in errors:
+                    self.stderr.write(f"Line {line_number}: {error}")
+                invalid += len(errors)
+                if valid:
+                    created += len(bulk_create_offers(user, valid, batch_size=options['chunk_size']))
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {created} offers, skipped {invalid} invalid records."))
+
+    def read_chunks(self, file, file_format, chunk_size):
+        if file_format == 'csv':
+            reader = csv.DictReader(file)
+            records = ((reader.line_num, row) for row in reader)
+        else:
+            records = ((number, line) for number, line in enumerate(file, start=1) if line.strip())
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def validate_chunks(self, chunks, file_format, workers):
+        """
+        Yields validation results in file order. At most `2 * workers` chunks are
+        in flight, so memory stays bounded for large files.
+        """
+        if workers == 1:
+            for chunk in chunks:
+                yield validate_chunk(file_format, chunk)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(validate_chunk, file_format, chunk))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from offers_app.cache import get_card_cache_stats, get_catalog_version, get_list_cache_stats, reset_card_cache_stats, reset_list_cache_stats
+
+
+class Command(BaseCommand):
+    """
+    Prints the hit / stale / miss counters of the offer list response cache
+    and the hit ratio of the per-offer card cache.
+    """
+
+    help = "Shows the offer list cache counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Reset the counters after printing them.")
+
+    def handle(self, *args, **options):
+        stats = get_list_cache_stats()
+        self.stdout.write(f"catalog version: {get_catalog_version()}")
+        for name in ['hit', 'stale', 'miss']:
+            self.stdout.write(f"{name}: {stats[name]}")
+        self.stdout.write(f"hit ratio: {stats['hit_ratio']:.2%}")
+
+        card_stats = get_card_cache_stats()
+        self.stdout.write(f"card hits: {card_stats['card_hit']}")
+        self.stdout.write(f"card misses: {card_stats['card_miss']}")
+        self.stdout.write(f"card hit ratio: {card_stats['card_hit_ratio']:.2%}")
+        if options['reset']:
+            reset_list_cache_stats()
+            reset_card_cache_stats()
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from offers_app.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the FTS5 search index from the offers table.
+
+    Use after bulk imports or raw SQL changes that bypassed the serializers.
+    """
+
+    help = "Rebuilds the full-text search index for offers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} offers."))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from offers_app.models import Offer
+from offers_app.cache import bump_catalog_version, invalidate_offer_cards
+
+
+class Command(BaseCommand):
+    """
+    Recalculates the stored `min_price` and `min_delivery_time` of every offer.
+
+    Intended for backfilling offers created before the columns existed.
+    """
+
+    help = "Recalculates the stored min_price and min_delivery_time of all offers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Offer.objects.annotate(
+            detail_min_price=Min('details__price'),
+            detail_min_delivery_time=Min('details__delivery_time_in_days')
+        ).order_by('pk')
+
+        updated = 0
+        batch = []
+        for offer in queryset.iterator(chunk_size=batch_size):
+            offer.min_price = offer.detail_min_price
+            offer.min_delivery_time = offer.detail_min_delivery_time
+            batch.append(offer)
+            if len(batch) >= batch_size:
+                updated += self.save_batch(batch)
+                batch = []
+        if batch:
+            updated += self.save_batch(batch)
+
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} offers."))
+
+    def save_batch(self, batch):
+        invalidate_offer_cards([offer.pk for offer in batch])
+        return Offer.objects.bulk_update(batch, ['min_price', 'min_delivery_time'])
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+SEARCH_TABLE = 'offers_app_offer_search'
+SEARCH_RANK = 'bm25(10.0, 2.0, 5.0)'
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Creates the FTS5 table (rowid = offer id) and indexes the existing offers.
+    FTS5 is SQLite only; other backends keep the LIKE search and get no table.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "title, description, detail_titles, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', %s)", [SEARCH_RANK])
+    schema_editor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    schema_editor.execute(
+        f"INSERT INTO {SEARCH_TABLE}(rowid, title, description, detail_titles) "
+        "SELECT offer.id, offer.title, offer.description, "
+        "COALESCE((SELECT group_concat(detail.title, ' ') FROM offers_app_offerdetail detail "
+        "WHERE detail.offer_id = offer.id), '') "
+        "FROM offers_app_offer offer"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 # Create your models here.
 
@@ -6,12 +7,42 @@ class Offer(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='offers')
     title = models.CharField(max_length=255)
     image = models.FileField(upload_to='uploads/', blank=True, null=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     description = models.TextField()
+    min_price = models.IntegerField(blank=True, null=True, db_index=True)
+    min_delivery_time = models.IntegerField(blank=True, null=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'updated_at'], name='offer_user_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
+
+    def refresh_min_values(self, details=None, save=True):
+        """
+        Recalculates the denormalized `min_price` and `min_delivery_time` columns.
+
+        Uses the given `details` if provided, otherwise reads the stored details.
+        Also moves `updated_at` forward, since the offer representation changed.
+        """
+        if details is None:
+            details = self.details.only('price', 'delivery_time_in_days')
+        details = list(details)
+
+        self.min_price = min((detail.price for detail in details), default=None)
+        self.min_delivery_time = min((detail.delivery_time_in_days for detail in details), default=None)
+
+        if save and self.pk:
+            self.updated_at = timezone.now()
+            Offer.objects.filter(pk=self.pk).update(
+                min_price=self.min_price,
+                min_delivery_time=self.min_delivery_time,
+                updated_at=self.updated_at
+            )
     
 
 class OfferDetail(models.Model):
@@ -27,4 +58,13 @@ class OfferDetail(models.Model):
     delivery_time_in_days = models.IntegerField()
     price = models.IntegerField()
     features = models.JSONField()
-    offer_type = models.CharField(max_length=255, choices=OFFER_TYPE_CHOICES)
\ No newline at end of file
+    offer_type = models.CharField(max_length=255, choices=OFFER_TYPE_CHOICES)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['offer', 'offer_type'], name='unique_offer_detail_type')
+        ]
+        indexes = [
+            models.Index(fields=['offer', 'price'], name='offerdetail_offer_price_idx'),
+            models.Index(fields=['offer', 'delivery_time_in_days'], name='offerdetail_offer_delivery_idx'),
+        ]
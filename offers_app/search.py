@@ -0,0 +1,129 @@
+from django.db import connections, DEFAULT_DB_ALIAS
+
+SEARCH_TABLE = 'offers_app_offer_search'
+SEARCH_RANK = 'bm25(10.0, 2.0, 5.0)'
+
+
+def is_search_index_enabled(using=DEFAULT_DB_ALIAS):
+    """
+    The FTS5 index is only maintained on SQLite; other backends keep the LIKE search.
+    """
+    return connections[using].vendor == 'sqlite'
+
+
+def create_search_index(using=DEFAULT_DB_ALIAS):
+    """
+    Creates the FTS5 table (rowid = offer id) if it does not exist yet.
+
+    The table is created by migration `0002_offer_search_index`; this is only a
+    safety net for `rebuild_search_index`. Columns are weighted title > detail titles > description for the relevance rank.
+    Prefix indexes keep search-as-you-type queries fast.
+    """
+    if not is_search_index_enabled(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            "title, description, detail_titles, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', %s)", [SEARCH_RANK])
+
+
+def index_offers(entries, using=DEFAULT_DB_ALIAS):
+    """
+    Inserts or replaces index rows.
+
+    `entries` is an iterable of `(offer_id, title, description, detail_titles)`
+    where `detail_titles` is a list of strings.
+    """
+    if not is_search_index_enabled(using):
+        return
+    rows = [(offer_id, title, description, ' '.join(detail_titles))
+            for offer_id, title, description, detail_titles in entries]
+    if not rows:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(row[0],) for row in rows])
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE}(rowid, title, description, detail_titles) VALUES (%s, %s, %s, %s)",
+            rows
+        )
+
+
+def index_offer(offer, detail_titles=None, using=DEFAULT_DB_ALIAS):
+    """
+    Indexes a single offer. Reads the detail titles if they are not given.
+    """
+    if detail_titles is None:
+        detail_titles = list(offer.details.values_list('title', flat=True))
+    index_offers([(offer.pk, offer.title, offer.description, detail_titles)], using=using)
+
+
+def remove_offers(offer_ids, using=DEFAULT_DB_ALIAS):
+    if not is_search_index_enabled(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(offer_id,) for offer_id in offer_ids])
+
+
+def rebuild_search_index(batch_size=1000, using=DEFAULT_DB_ALIAS):
+    """
+    Drops all index rows and re-indexes every offer in batches. Returns the number of offers.
+    """
+    from offers_app.models import Offer, OfferDetail
+
+    if not is_search_index_enabled(using):
+        return 0
+    create_search_index(using)
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+    total = 0
+    offers = Offer.objects.using(using).order_by('pk').values_list('pk', 'title', 'description')
+    batch = []
+    for row in offers.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            total += _index_batch(batch, OfferDetail, using)
+            batch = []
+    if batch:
+        total += _index_batch(batch, OfferDetail, using)
+    return total
+
+
+def _index_batch(batch, detail_model, using):
+    titles = {}
+    details = detail_model.objects.using(using).filter(offer_id__in=[row[0] for row in batch])
+    for offer_id, title in details.values_list('offer_id', 'title'):
+        titles.setdefault(offer_id, []).append(title)
+    index_offers([(pk, title, description, titles.get(pk, [])) for pk, title, description in batch], using=using)
+    return len(batch)
+
+
+def build_match_query(terms):
+    """
+    Turns search terms into an FTS5 query: every term must match as a word prefix.
+
+    Terms are quoted so user input can never be interpreted as FTS5 syntax.
+    """
+    tokens = []
+    for term in terms:
+        term = term.replace('"', '""').strip()
+        if term:
+            tokens.append(f'"{term}"*')
+    return ' AND '.join(tokens)
+
+
+def build_match_subquery(match_query):
+    """
+    SQL and params selecting the ids of the offers matching `match_query`.
+    """
+    return f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [match_query]
+
+
+def build_rank_subquery(match_query, id_column):
+    """
+    SQL and params of the relevance rank (lower is better) of the offer in `id_column`.
+    """
+    return f"SELECT rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND rowid = {id_column}", [match_query]
@@ -0,0 +1,81 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from offers_app.models import Offer, OfferDetail
+from offers_app.search import index_offer, remove_offers
+from offers_app.cache import invalidate_catalog, invalidate_offer_cards
+from core.images import delete_derivatives, derivatives_are_current, schedule_derivatives
+
+@receiver(post_delete, sender=OfferDetail)
+def refresh_offer_min_values(sender, instance, origin=None, **kwargs):
+    """
+    Keeps the denormalized min values and the search index of the parent offer
+    in sync when a detail is deleted.
+
+    Skipped when the detail is removed as part of deleting the offer itself.
+    """
+    if isinstance(origin, Offer) or getattr(origin, 'model', None) is Offer:
+        return
+    offer = Offer.objects.filter(pk=instance.offer_id).first()
+    if offer is not None:
+        offer.refresh_min_values()
+        index_offer(offer)
+
+
+@receiver(post_delete, sender=Offer)
+def remove_offer_from_search_index(sender, instance, **kwargs):
+    remove_offers([instance.pk])
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+def invalidate_offer_list_cache(sender, **kwargs):
+    """
+    Bumps the catalog version on every offer or detail write.
+    """
+    invalidate_catalog()
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+def invalidate_offer_card(sender, instance, **kwargs):
+    invalidate_offer_cards([instance.pk])
+
+
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+def invalidate_offer_card_for_detail(sender, instance, **kwargs):
+    invalidate_offer_cards([instance.offer_id])
+
+
+OWNER_CARD_FIELDS = {'first_name', 'last_name', 'username'}
+
+
+@receiver(post_save, sender=User)
+def invalidate_offer_cards_for_owner(sender, instance, created=False, update_fields=None, **kwargs):
+    """
+    Offer cards embed the owner's name (`user_details`), so they are dropped when
+    the user is saved. Saves that only touch other fields (e.g. `last_login`) are ignored.
+    """
+    if created or (update_fields is not None and not OWNER_CARD_FIELDS & set(update_fields)):
+        return
+    offer_ids = list(Offer.objects.filter(user_id=instance.pk).values_list('pk', flat=True))
+    if offer_ids:
+        invalidate_offer_cards(offer_ids)
+        invalidate_catalog()
+
+
+@receiver(post_save, sender=Offer)
+def refresh_offer_image_derivatives(sender, instance, **kwargs):
+    """
+    Schedules thumbnail / placeholder generation when the offer image was uploaded or replaced.
+    """
+    if not derivatives_are_current(instance.image, instance.image_derivatives):
+        schedule_derivatives(Offer, instance.pk, 'image', 'image_derivatives', f'uploads/derivatives/offers/{instance.pk}')
+
+
+@receiver(post_delete, sender=Offer)
+def delete_offer_image_derivatives(sender, instance, **kwargs):
+    delete_derivatives(instance.image.storage, instance.image_derivatives)
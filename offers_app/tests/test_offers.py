@@ -1,15 +1,33 @@
 from rest_framework.test import APITestCase, APIClient
 from django.urls import reverse
 from rest_framework import status
-from offers_app.models import Offer
+from offers_app.models import Offer, OfferDetail
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 from django.utils import timezone
 from datetime import timedelta
+import json
+import tempfile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from io import BytesIO, StringIO
+import shutil
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+import csv
+import os
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from django.core.cache import cache
+from unittest import mock
+from offers_app.api.views import OfferViewSet
+from offers_app.cache import LIST_LOCK_KEY, build_list_cache_key, get_card_cache_stats, reset_card_cache_stats, get_list_cache_stats
 
 
 class OfferTest(APITestCase):
     def setUp(self):
+        cache.clear()
         self.user_business = User.objects.create_user(
             username="testbusiness", password="testpassword", email="test@test.de")
         self.user_business.userprofile.type = 'business'
@@ -144,6 +162,13 @@ class OfferTest(APITestCase):
                          [0], "Ein Offer muss mindestens 3 Details haben!")
         self.assertEqual(Offer.objects.count(), 0)
 
+    def test_post_offer_rolled_back_when_indexing_fails(self):
+        with mock.patch('offers_app.api.serializers.index_offer', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(reverse('offer-list'), self.get_offer_data(), format='json')
+        self.assertFalse(Offer.objects.exists())
+        self.assertFalse(OfferDetail.objects.exists())
+
     def test_get_offers_no_filter(self):
         self.create_dummy_offers()
         url = reverse('offer-list')
@@ -354,4 +379,481 @@ class OfferTest(APITestCase):
         get_response = self.client.get(get_url)
         self.assertEqual(get_response.status_code, status.HTTP_200_OK)
         self.assertEqual(get_response.data['id'], detail_id)
-        self.assertTrue(len(get_response.data['features']) > 0)
\ No newline at end of file
+        self.assertTrue(len(get_response.data['features']) > 0)
+
+    def test_post_offer_stores_min_values(self):
+        offer_id, _ = self.create_offer_and_get_detail_url()
+        offer = Offer.objects.get(pk=offer_id)
+        self.assertEqual(offer.min_price, 100)
+        self.assertEqual(offer.min_delivery_time, 3)
+
+    def test_update_single_offer_refreshes_min_values(self):
+        offer_id, detail_url = self.create_offer_and_get_detail_url()
+        patch_data = {
+            "details": [
+                {"price": 400, "delivery_time_in_days": 9, "offer_type": "basic"}
+            ]
+        }
+        patch_response = self.client.patch(detail_url, patch_data, format='json')
+        self.assertEqual(patch_response.status_code, status.HTTP_200_OK)
+        offer = Offer.objects.get(pk=offer_id)
+        self.assertEqual(offer.min_price, 200)
+        self.assertEqual(offer.min_delivery_time, 5)
+
+    def test_delete_offer_detail_refreshes_min_values(self):
+        offer_id, _ = self.create_offer_and_get_detail_url()
+        offer = Offer.objects.get(pk=offer_id)
+        offer.details.get(offer_type='basic').delete()
+        offer.refresh_from_db()
+        self.assertEqual(offer.min_price, 200)
+        self.assertEqual(offer.min_delivery_time, 5)
+
+    def count_queries_for_list(self, params):
+        url = reverse('offer-list')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response
+
+    @override_settings(OFFER_LIST_CACHE={'ENABLED': False})
+    def test_get_offers_query_count_does_not_grow_with_page_size(self):
+        self.create_dummy_offers(count=6)
+        self.client.credentials()
+        small_count, small_response = self.count_queries_for_list({'page_size': 1})
+        large_count, large_response = self.count_queries_for_list({'page_size': 6})
+        self.assertEqual(len(small_response.data['results']), 1)
+        self.assertEqual(len(large_response.data['results']), 6)
+        self.assertEqual(small_count, large_count)
+
+    @override_settings(OFFER_LIST_CACHE={'ENABLED': False}, OFFER_CARD_CACHE={'ENABLED': False})
+    def test_get_offers_query_count_is_constant(self):
+        self.create_dummy_offers(count=6)
+        self.client.credentials()
+        url = reverse('offer-list')
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'ordering': 'min_price', 'max_delivery_time': 10})
+        self.assertEqual(len(response.data['results']), 6)
+        for offer in response.data['results']:
+            self.assertEqual(len(offer['details']), 3)
+            self.assertEqual(offer['user_details']['username'], self.user_business.username)
+
+    def test_get_single_offer_query_count_is_constant(self):
+        offer_id, detail_url = self.create_offer_and_get_detail_url()
+        with self.assertNumQueries(4):
+            response = self.client.get(detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['details']), 3)
+
+    def collect_cursor_pages(self, params):
+        url = reverse('offer-list')
+        response = self.client.get(url, dict(params, pagination='cursor'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        pages = [response.data]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+        return pages
+
+    def test_get_offers_cursor_pagination_min_price(self):
+        self.create_dummy_offers()
+        Offer.objects.update(min_price=100)
+        pages = self.collect_cursor_pages({'ordering': 'min_price', 'page_size': 2})
+        ids = [offer['id'] for page in pages for offer in page['results']]
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(ids, sorted(Offer.objects.values_list('id', flat=True)))
+
+    def test_get_offers_cursor_pagination_min_price_with_detail_less_offers(self):
+        self.create_dummy_offers()
+        offers = list(Offer.objects.order_by('id'))
+        for offer in offers[1:3]:
+            offer.details.all().delete()
+        self.assertEqual(Offer.objects.filter(min_price__isnull=True).count(), 2)
+
+        for ordering in ['min_price', '-min_price']:
+            pages = self.collect_cursor_pages({'ordering': ordering, 'page_size': 2})
+            ids = [offer['id'] for page in pages for offer in page['results']]
+            self.assertEqual(sorted(ids), [offer.id for offer in offers])
+            prices = [offer['min_price'] for page in pages for offer in page['results']]
+            null_positions = [i for i, price in enumerate(prices) if price is None]
+            self.assertEqual(null_positions, [0, 1] if ordering == 'min_price' else [3, 4])
+
+    def test_get_offers_cursor_pagination_updated_at_desc(self):
+        self.create_dummy_offers()
+        pages = self.collect_cursor_pages({'ordering': '-updated_at', 'page_size': 2})
+        titles = [offer['title'] for page in pages for offer in page['results']]
+        self.assertEqual(titles, ['Angebot 4', 'Angebot 3', 'Angebot 2', 'Angebot 1', 'Angebot 0'])
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_get_offers_cursor_pagination_with_filters(self):
+        self.create_dummy_offers()
+        pages = self.collect_cursor_pages({'max_delivery_time': 4, 'search': 'Angebot', 'page_size': 1})
+        delivery_times = [offer['min_delivery_time'] for page in pages for offer in page['results']]
+        self.assertEqual(len(delivery_times), 2)
+        self.assertTrue(all(time <= 4 for time in delivery_times))
+
+    def test_get_offers_cursor_pagination_previous_link(self):
+        self.create_dummy_offers()
+        pages = self.collect_cursor_pages({'page_size': 2})
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], pages[-2]['results'])
+
+    @override_settings(OFFER_LIST_CACHE={'ENABLED': False})
+    def test_get_offers_cursor_pagination_query_count_is_constant(self):
+        self.create_dummy_offers(count=6)
+        self.client.credentials()
+        pages = self.collect_cursor_pages({'page_size': 2})
+        first_count, _ = self.count_queries_for_list({'pagination': 'cursor', 'page_size': 2})
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(pages[-1]['previous'])
+        self.assertEqual(first_count, len(context.captured_queries))
+
+    def test_get_offers_invalid_cursor(self):
+        url = reverse('offer-list')
+        response = self.client.get(url, {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_offers_search_for_detail_title(self):
+        offer_id, detail_url = self.create_offer_and_get_detail_url()
+        patch_data = {"details": [{"title": "Logodesign Express", "offer_type": "premium"}]}
+        self.client.patch(detail_url, patch_data, format='json')
+        url = reverse('offer-list')
+        response = self.client.get(url, {'search': 'logodes'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([offer['id'] for offer in response.data['results']], [offer_id])
+
+    def test_get_offers_search_ranked_by_relevance(self):
+        self.create_dummy_offers(count=2)
+        offer_data = self.get_offer_data()
+        offer_data['title'] = "Webdesign"
+        offer_data['description'] = "Modernes Webdesign"
+        self.client.post(reverse('offer-list'), offer_data, format='json')
+        offer_data['title'] = "Fotografie"
+        offer_data['description'] = "Auch Webdesign möglich"
+        self.client.post(reverse('offer-list'), offer_data, format='json')
+        response = self.client.get(reverse('offer-list'), {'search': 'webdesign'})
+        titles = [offer['title'] for offer in response.data['results']]
+        self.assertEqual(titles, ['Webdesign', 'Fotografie'])
+
+    def test_get_offers_search_cached_per_applied_ordering(self):
+        offer_data = self.get_offer_data()
+        offer_data['title'] = "Fotografie"
+        offer_data['description'] = "Auch Webdesign möglich"
+        self.client.post(reverse('offer-list'), offer_data, format='json')
+        offer_data['title'] = "Webdesign"
+        offer_data['description'] = "Modernes Webdesign"
+        self.client.post(reverse('offer-list'), offer_data, format='json')
+        url = reverse('offer-list')
+
+        response = self.client.get(url, {'search': 'webdesign'})
+        self.assertEqual([offer['title'] for offer in response.data['results']], ['Webdesign', 'Fotografie'])
+        response = self.client.get(url, {'search': 'webdesign', 'ordering': 'updated_at'})
+        self.assertEqual(response['X-Cache'], 'miss')
+        self.assertEqual([offer['title'] for offer in response.data['results']], ['Fotografie', 'Webdesign'])
+
+        response = self.client.get(url, {'search': 'webdesign'})
+        self.assertEqual(response['X-Cache'], 'hit')
+        self.assertEqual([offer['title'] for offer in response.data['results']], ['Webdesign', 'Fotografie'])
+        response = self.client.get(url, {'search': 'webdesign', 'ordering': 'updated_at'})
+        self.assertEqual(response['X-Cache'], 'hit')
+        self.assertEqual([offer['title'] for offer in response.data['results']], ['Fotografie', 'Webdesign'])
+
+    def test_get_offers_search_ignores_fts_syntax(self):
+        self.create_dummy_offers(count=2)
+        response = self.client.get(reverse('offer-list'), {'search': 'Angebot" OR NEAR(*'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 0)
+
+    def test_deleted_offer_is_removed_from_search(self):
+        offer_id, detail_url = self.create_offer_and_get_detail_url()
+        self.client.delete(detail_url)
+        response = self.client.get(reverse('offer-list'), {'search': 'Testangebot'})
+        self.assertEqual(response.data['count'], 0)
+
+
+    def test_get_offers_served_from_cache(self):
+        self.create_dummy_offers()
+        url = reverse('offer-list')
+        first_response = self.client.get(url, {'ordering': 'updated_at'})
+        self.assertEqual(first_response['X-Cache'], 'miss')
+        with self.assertNumQueries(1):
+            second_response = self.client.get(url, {'page': 1, 'ordering': 'updated_at'})
+        self.assertEqual(second_response['X-Cache'], 'hit')
+        self.assertEqual(second_response.data, first_response.data)
+        stats = get_list_cache_stats()
+        self.assertEqual((stats['hit'], stats['miss']), (1, 1))
+
+    def test_get_offers_cache_invalidated_by_offer_write(self):
+        self.create_dummy_offers(count=2)
+        url = reverse('offer-list')
+        self.client.get(url)
+        self.create_dummy_offers(count=1)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'miss')
+        self.assertEqual(response.data['count'], 3)
+
+    def test_get_offers_serves_stale_entry_while_refreshing(self):
+        self.create_dummy_offers(count=2)
+        url = reverse('offer-list')
+        request = self.client.get(url).renderer_context['request']
+        self.create_dummy_offers(count=1)
+        key = build_list_cache_key(request, defaults={'page': 1, 'ordering': 'updated_at'}, overrides={'page_size': 6})
+        cache.add(LIST_LOCK_KEY.format(key), 1)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'stale')
+        self.assertEqual(response.data['count'], 2)
+
+    def test_get_offers_releases_refresh_lock_when_rendering_fails(self):
+        self.create_dummy_offers(count=2)
+        url = reverse('offer-list')
+        request = self.client.get(url).renderer_context['request']
+        self.create_dummy_offers(count=1)
+        key = build_list_cache_key(request, defaults={'page': 1, 'ordering': 'updated_at'}, overrides={'page_size': 6})
+
+        with mock.patch.object(OfferViewSet, 'list_from_cards', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.get(url)
+        self.assertIsNone(cache.get(LIST_LOCK_KEY.format(key)))
+
+        facets_url = reverse('offer-facets')
+        facets_request = self.client.get(facets_url, {'min_price': 1}).renderer_context['request']
+        facets_key = build_list_cache_key(facets_request, defaults={}, namespace='facets')
+        self.create_dummy_offers(count=1)
+        with mock.patch('offers_app.api.views.get_offer_facets', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.get(facets_url, {'min_price': 1})
+        self.assertIsNone(cache.get(LIST_LOCK_KEY.format(facets_key)))
+
+    @override_settings(OFFER_LIST_CACHE={'ENABLED': False})
+    def test_get_offers_assembled_from_offer_cards(self):
+        self.create_dummy_offers(count=6)
+        self.client.credentials()
+        url = reverse('offer-list')
+        with override_settings(OFFER_CARD_CACHE={'ENABLED': False}):
+            expected = self.client.get(url).data
+
+        first_response = self.client.get(url)
+        with self.assertNumQueries(2):
+            second_response = self.client.get(url)
+        self.assertEqual(first_response.data, expected)
+        self.assertEqual(second_response.data, expected)
+        stats = get_card_cache_stats()
+        self.assertEqual((stats['card_hit'], stats['card_miss']), (6, 6))
+        self.assertEqual(stats['card_hit_ratio'], 0.5)
+
+        cursor_response = self.client.get(url, {'pagination': 'cursor', 'page_size': 3})
+        self.assertEqual(cursor_response.data['results'], expected['results'][:3])
+        self.assertIsNotNone(cursor_response.data['next'])
+
+    @override_settings(OFFER_LIST_CACHE={'ENABLED': False})
+    def test_offer_cards_rebuilt_after_offer_detail_and_owner_changes(self):
+        offer_id, detail_url = self.create_offer_and_get_detail_url()
+        url = reverse('offer-list')
+        self.client.get(url)
+
+        self.client.patch(detail_url, {"details": [{"price": 10, "offer_type": "basic"}]}, format='json')
+        self.assertEqual(self.client.get(url).data['results'][0]['min_price'], 10)
+
+        self.user_business.first_name = 'Neu'
+        self.user_business.save()
+        self.assertEqual(self.client.get(url).data['results'][0]['user_details']['first_name'], 'Neu')
+
+    @override_settings(OFFER_LIST_CACHE={'ENABLED': False})
+    def test_outdated_offer_card_is_a_miss(self):
+        offer_id, _ = self.create_offer_and_get_detail_url()
+        url = reverse('offer-list')
+        self.client.get(url)
+
+        # A card written back from an instance loaded before this update keeps the old stamp.
+        Offer.objects.filter(pk=offer_id).update(title='Nach dem Update', updated_at=timezone.now())
+        reset_card_cache_stats()
+        self.assertEqual(self.client.get(url).data['results'][0]['title'], 'Nach dem Update')
+        self.assertEqual(get_card_cache_stats()['card_miss'], 1)
+
+    def test_get_offer_facets(self):
+        self.create_dummy_offers()
+        self.client.credentials()
+        url = reverse('offer-facets')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 5)
+        price = {(band['from'], band['to']): band['count'] for band in response.data['price']}
+        self.assertEqual(price[(50, 100)], 5)
+        self.assertEqual(sum(price.values()), 5)
+        delivery = {(band['from'], band['to']): band['count'] for band in response.data['delivery_time']}
+        self.assertEqual((delivery[(2, 4)], delivery[(4, 8)]), (1, 4))
+
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'min_price': 70, 'search': 'Angebot'})
+        self.assertEqual(response.data['count'], 3)
+        delivery = {(band['from'], band['to']): band['count'] for band in response.data['delivery_time']}
+        self.assertEqual(delivery[(4, 8)], 3)
+        self.assertEqual(self.client.get(url, {'min_price': 70, 'search': 'Angebot'})['X-Cache'], 'hit')
+
+    def test_get_offer_facets_invalid_filter(self):
+        response = self.client.get(reverse('offer-facets'), {'min_price': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_single_offer_not_modified(self):
+        offer_id, detail_url = self.create_offer_and_get_detail_url()
+        response = self.client.get(detail_url)
+        etag = response['ETag']
+        with self.assertNumQueries(2):
+            response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(detail_url, {"details": [{"price": 10, "offer_type": "basic"}]}, format='json')
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['min_price'], 10)
+
+    def test_get_details_for_single_offer_not_modified(self):
+        offer_id, _ = self.create_offer_and_get_detail_url()
+        detail_id = Offer.objects.get(pk=offer_id).details.first().id
+        get_url = reverse('offer-details', kwargs = {'pk': detail_id})
+        response = self.client.get(get_url)
+        response = self.client.get(get_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+    def test_bulk_create_offers(self):
+        url = reverse('offer-bulk-create')
+        payload = [self.get_offer_data() for _ in range(4)]
+        payload[1]['title'] = "Bulk Logo"
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(Offer.objects.count(), 4)
+        self.assertEqual(OfferDetail.objects.count(), 12)
+        offer = Offer.objects.get(pk=response.data['ids'][1])
+        self.assertEqual((offer.min_price, offer.min_delivery_time), (100, 3))
+        search_response = self.client.get(reverse('offer-list'), {'search': 'bulk logo'})
+        self.assertEqual([item['id'] for item in search_response.data['results']], [offer.id])
+
+    def test_bulk_create_offers_invalid_entry_creates_nothing(self):
+        url = reverse('offer-bulk-create')
+        payload = [self.get_offer_data(), self.get_offer_less_than_three_details_data()]
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Offer.objects.count(), 0)
+
+    def test_bulk_create_offers_requires_list(self):
+        url = reverse('offer-bulk-create')
+        response = self.client.post(url, self.get_offer_data(), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_offers_as_customer(self):
+        url = reverse('offer-bulk-create')
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token_customer.key)
+        response = self.client.post(url, [self.get_offer_data()], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_offers_command_ndjson(self):
+        offers = [self.get_offer_data() for _ in range(5)]
+        offers[2] = self.get_offer_less_than_three_details_data()
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as file:
+            for offer in offers:
+                file.write(json.dumps(offer) + "\n")
+        self.addCleanup(os.remove, file.name)
+        call_command('import_offers', file.name, user=self.user_business.username,
+                     workers=2, chunk_size=2, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Offer.objects.filter(user=self.user_business).count(), 4)
+        self.assertEqual(OfferDetail.objects.count(), 12)
+
+    def test_import_offers_command_csv(self):
+        columns = ['title', 'description']
+        row = ['CSV Angebot', 'Aus einer Datei']
+        for offer_type, price in [('basic', 80), ('standard', 120), ('premium', 200)]:
+            columns += [f'{offer_type}_{field}' for field in ['title', 'revisions', 'delivery_time_in_days', 'price', 'features']]
+            row += [f'{offer_type} Paket', '2', '4', str(price), 'Logo|Icons']
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(columns)
+            writer.writerow(row)
+        self.addCleanup(os.remove, file.name)
+        call_command('import_offers', file.name, user=str(self.user_business.id), workers=1, stdout=StringIO())
+        offer = Offer.objects.get()
+        self.assertEqual(offer.min_price, 80)
+        self.assertEqual(offer.details.get(offer_type='basic').features, ['Logo', 'Icons'])
+
+    def test_import_offers_command_rejects_customer(self):
+        with self.assertRaises(CommandError):
+            call_command('import_offers', 'missing.ndjson', user=self.user_customer.username)
+
+    def capture_writes(self, detail_url, patch_data):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(detail_url, patch_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [query['sql'] for query in context.captured_queries
+                if query['sql'].split()[0] in ('UPDATE', 'INSERT', 'DELETE')]
+
+    def test_update_single_offer_noop_does_not_write(self):
+        offer_id, detail_url = self.create_offer_and_get_detail_url()
+        offer_data = self.get_offer_data()
+        patch_data = {'title': offer_data['title'], 'details': [offer_data['details'][0]]}
+        self.assertEqual(self.capture_writes(detail_url, patch_data), [])
+
+    def test_update_single_offer_details_writes_changed_fields_only(self):
+        offer_id, detail_url = self.create_offer_and_get_detail_url()
+        patch_data = {"details": [
+            {"price": 90, "offer_type": "basic"},
+            {"price": 190, "offer_type": "standard"}
+        ]}
+        writes = self.capture_writes(detail_url, patch_data)
+        detail_writes = [sql for sql in writes if 'offers_app_offerdetail' in sql]
+        offer_writes = [sql for sql in writes if sql.startswith('UPDATE "offers_app_offer" ')]
+        self.assertEqual(len(detail_writes), 1)
+        self.assertNotIn('"title"', detail_writes[0])
+        self.assertEqual(len(offer_writes), 1)
+        self.assertNotIn('"description"', offer_writes[0])
+        offer = Offer.objects.get(pk=offer_id)
+        self.assertEqual(offer.min_price, 90)
+        self.assertEqual(offer.details.get(offer_type='standard').price, 190)
+
+    def test_post_offer_duplicate_offer_type(self):
+        offer_data = self.get_offer_data()
+        offer_data['details'][1]['offer_type'] = 'basic'
+        response = self.client.post(reverse('offer-list'), offer_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Offer.objects.count(), 0)
+
+    def test_get_offers_filter_with_invalid_number(self):
+        url = reverse('offer-list')
+        for param in ['creator_id', 'min_price', 'max_delivery_time']:
+            response = self.client.get(url, {param: 'abc'})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(param, response.data)
+
+    def make_image(self, name='bild.png', size=(800, 600)):
+        buffer = BytesIO()
+        Image.new('RGB', size, (200, 30, 30)).save(buffer, format='PNG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+    def test_offer_image_derivatives_in_list(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        with override_settings(MEDIA_ROOT=media_root, IMAGE_DERIVATIVES={'ASYNC': False}):
+            offer_id, detail_url = self.create_offer_and_get_detail_url()
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(detail_url, {'image': self.make_image()}, format='multipart')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            offer = Offer.objects.get(pk=offer_id)
+            old_thumbnail = offer.image_derivatives['thumbnail']
+            self.assertTrue(offer.image.storage.exists(old_thumbnail))
+            with offer.image.storage.open(old_thumbnail) as file:
+                self.assertLessEqual(Image.open(file).size[0], 480)
+
+            item = self.client.get(reverse('offer-list')).data['results'][0]
+            self.assertTrue(item['image_derivatives']['thumbnail'].endswith('-thumbnail.jpg'))
+            self.assertTrue(item['image_derivatives']['placeholder'].startswith('data:image/jpeg;base64,'))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(detail_url, {'image': self.make_image('neu.png')}, format='multipart')
+            offer.refresh_from_db()
+            self.assertNotEqual(offer.image_derivatives['thumbnail'], old_thumbnail)
+            self.assertFalse(offer.image.storage.exists(old_thumbnail))
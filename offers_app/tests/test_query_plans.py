@@ -0,0 +1,83 @@
+import json
+import os
+from itertools import combinations
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from offers_app.api.views import OfferViewSet
+
+SNAPSHOT_PATH = Path(__file__).parent / 'snapshots' / 'offer_query_plans.json'
+UPDATE_SNAPSHOTS = os.environ.get('UPDATE_QUERY_PLAN_SNAPSHOTS') == '1'
+
+FILTER_PARAMS = {
+    'creator_id': '1',
+    'min_price': '50',
+    'max_delivery_time': '5',
+    'search': 'logo',
+}
+ORDERINGS = [None, 'min_price']
+
+
+class OfferQueryPlanTest(TestCase):
+    """
+    Snapshot of the SQLite `EXPLAIN QUERY PLAN` for the offer list page query,
+    one entry per filter / ordering combination.
+
+    Run with `UPDATE_QUERY_PLAN_SNAPSHOTS=1` to rewrite the snapshot after an
+    intended change (new index, different query shape).
+    """
+
+    def build_list_queryset(self, params):
+        view = OfferViewSet()
+        view.action = 'list'
+        view.format_kwarg = None
+        view.kwargs = {}
+        view.request = Request(APIRequestFactory().get('/api/offers/', params))
+        return view.filter_queryset(view.get_queryset())[:6]
+
+    def explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            rows = cursor.fetchall()
+
+        depth = {0: -1}
+        lines = []
+        for node_id, parent_id, _, detail in rows:
+            depth[node_id] = depth.get(parent_id, -1) + 1
+            lines.append('  ' * depth[node_id] + detail)
+        return lines
+
+    def get_combinations(self):
+        names = list(FILTER_PARAMS)
+        for size in range(len(names) + 1):
+            for selected in combinations(names, size):
+                for ordering in ORDERINGS:
+                    params = {name: FILTER_PARAMS[name] for name in selected}
+                    if ordering:
+                        params['ordering'] = ordering
+                    key = '&'.join(f'{name}={value}' for name, value in sorted(params.items())) or 'default'
+                    yield key, params
+
+    def test_offer_list_query_plans(self):
+        plans = {key: self.explain(self.build_list_queryset(params)) for key, params in self.get_combinations()}
+
+        for key, plan in plans.items():
+            text = '\n'.join(plan)
+            self.assertNotIn('DISTINCT', text, key)
+            self.assertNotIn('GROUP BY', text, key)
+            self.assertNotIn('offers_app_offerdetail', text, key)
+
+        if UPDATE_SNAPSHOTS:
+            SNAPSHOT_PATH.parent.mkdir(exist_ok=True)
+            SNAPSHOT_PATH.write_text(json.dumps(plans, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+        elif not SNAPSHOT_PATH.exists():
+            self.fail(f'Missing query plan snapshot {SNAPSHOT_PATH.name}; run with UPDATE_QUERY_PLAN_SNAPSHOTS=1 to create it.')
+
+        expected = json.loads(SNAPSHOT_PATH.read_text(encoding='utf-8'))
+        self.assertEqual(sorted(plans), sorted(expected))
+        for key, plan in plans.items():
+            self.assertEqual(plan, expected[key], f"Query plan changed for '{key}'")
@@ -0,0 +1,89 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from orders_app.models import Order
+
+ORDER_DATE_FILTERS = {
+    'created_after': 'created_at__gte',
+    'created_before': 'created_at__lt',
+}
+
+
+def parse_order_date(param, value):
+    """
+    Accepts an ISO date (midnight in the current time zone) or an ISO datetime.
+    """
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            date = parse_date(value)
+            parsed = datetime.combine(date, time.min) if date else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({param: f"{param} has to be an ISO date or datetime"})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def build_order_filter(query_params):
+    """
+    Compiles the order list query parameters into a single `Q`.
+
+    - `status`: one of the `Order.STATUS_CHOICES`
+    - `created_after`: `created_at >= value` (ISO date or datetime)
+    - `created_before`: `created_at < value` (ISO date or datetime)
+
+    Invalid values raise a `ValidationError`.
+    """
+    conditions = Q()
+    order_status = query_params.get('status')
+    if order_status:
+        if order_status not in dict(Order.STATUS_CHOICES):
+            raise ValidationError({'status': [f'"{order_status}" is not a valid choice.']})
+        conditions &= Q(status=order_status)
+
+    for param, lookup in ORDER_DATE_FILTERS.items():
+        value = query_params.get(param)
+        if value:
+            conditions &= Q(**{lookup: parse_order_date(param, value)})
+    return conditions
+
+
+ANALYTICS_DEFAULT_DAYS = 30
+ANALYTICS_MAX_DAYS = 366
+
+
+def parse_analytics_range(query_params):
+    """
+    Returns the inclusive `(date_from, date_to)` of the analytics query parameters.
+
+    - `date_to`: ISO date, defaults to today
+    - `date_from`: ISO date, defaults to `ANALYTICS_DEFAULT_DAYS` days before `date_to`
+
+    Raises a `ValidationError` for invalid dates, reversed ranges and ranges longer
+    than `ANALYTICS_MAX_DAYS` days.
+    """
+    dates = {}
+    for param in ['date_from', 'date_to']:
+        value = query_params.get(param)
+        if not value:
+            continue
+        try:
+            dates[param] = parse_date(value)
+        except ValueError:
+            dates[param] = None
+        if dates[param] is None:
+            raise ValidationError({param: f"{param} has to be an ISO date"})
+
+    date_to = dates.get('date_to') or timezone.localdate()
+    date_from = dates.get('date_from') or date_to - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+    if date_from > date_to:
+        raise ValidationError({'date_from': "date_from has to be before date_to"})
+    if (date_to - date_from).days >= ANALYTICS_MAX_DAYS:
+        raise ValidationError({'date_from': f"At most {ANALYTICS_MAX_DAYS} days per request."})
+    return date_from, date_to
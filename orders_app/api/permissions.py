@@ -33,4 +33,4 @@ class isUserFromTypeCustomer(permissions.BasePermission):
         user_type = getattr(request.user.userprofile, 'type', None)
 
         if request.method in ['PUT', 'PATCH']:
-            return user_type == 'business' and obj.business_user == request.user
+            return user_type == 'business' and obj.business_user_id == request.user.id
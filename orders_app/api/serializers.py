@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from orders_app.models import Order
+from orders_app.models import FeatureSnapshot, Order
 from offers_app.models import OfferDetail
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -15,10 +15,12 @@ class OrderSerializer(serializers.ModelSerializer):
     - Ensures the user creating the order has a profile type of "customer".
 
     Behavior:
-    - On create, auto-fills order details from the selected OfferDetail.
+    - On create, auto-fills order details from the selected OfferDetail. The features
+      are stored once per distinct list in `FeatureSnapshot` and referenced by the order.
     """
 
     offer_detail_id = serializers.IntegerField(write_only=True)
+    features = serializers.JSONField(source='snapshot_features', read_only=True)
 
     class Meta:
         model = Order
@@ -55,7 +57,7 @@ class OrderSerializer(serializers.ModelSerializer):
             revisions = offer_detail.revisions,
             delivery_time_in_days = offer_detail.delivery_time_in_days,
             price = offer_detail.price,
-            features = offer_detail.features,
+            feature_snapshot = FeatureSnapshot.for_features(offer_detail.features),
             offer_type = offer_detail.offer_type,
         )
 
@@ -71,7 +73,9 @@ class OrderUpdateSerializer(serializers.ModelSerializer):
     - Used by either customer or business users to update the order status
       (e.g., to mark it as `in_progress`, `completed`, etc.).
     """
-    
+
+    features = serializers.JSONField(source='snapshot_features', read_only=True)
+
     class Meta:
         model = Order
         fields = ['id', 'customer_user', 'business_user', 'title', 'revisions', 'delivery_time_in_days',
@@ -1,11 +1,16 @@
 from django.urls import path
-from orders_app.api.views import OrderViewSet, OrderCountView, CompletedOrderCountView
+from orders_app.api.views import OrderViewSet, OrderCountView, CompletedOrderCountView, BatchOrderCountView, OrderAnalyticsView, OrderEventStreamView, OrderEventTokenView
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
 router.register(r'orders', OrderViewSet, basename='order')
 
-urlpatterns = router.urls + [
+urlpatterns = [
+    path('orders/events/', OrderEventStreamView.as_view(), name='order-events'),
+    path('orders/events/token/', OrderEventTokenView.as_view(), name='order-events-token'),
+] + router.urls + [
     path('order-count/<int:business_user_id>/', OrderCountView.as_view(), name='order-count'),
     path('completed-order-count/<int:business_user_id>/', CompletedOrderCountView.as_view(), name='completed-order-count'),
+    path('order-counts/', BatchOrderCountView.as_view(), name='order-counts'),
+    path('order-analytics/<int:business_user_id>/', OrderAnalyticsView.as_view(), name='order-analytics'),
 ]
\ No newline at end of file
@@ -1,5 +1,15 @@
 from django.shortcuts import get_object_or_404
-from orders_app.models import Order
+import json
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.authtoken.models import Token
+from orders_app.events import get_order_event_settings, make_stream_token, order_event_bus, read_stream_token
+from orders_app.models import ArchivedOrder, BusinessDailyRollup, BusinessOrderCounter, Order, OrderEvent
 from user_auth_app.models import User
 from orders_app.api.serializers import OrderSerializer, OrderUpdateSerializer
 from rest_framework.views import APIView
@@ -7,7 +17,31 @@ from rest_framework import viewsets
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from orders_app.api.permissions import isUserFromTypeCustomer
-from django.db.models import Q
+from django.db.models import Q, Value, prefetch_related_objects
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, NotFound, PermissionDenied, ValidationError
+from orders_app.export import EXPORT_FORMATS, iter_export
+from orders_app.api.filters import build_order_filter, parse_analytics_range
+from orders_app.archive import include_archived
+from core.pagination import KeysetCursorPagination
+
+
+class OrderStatusConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The order status was changed by another request.'
+    default_code = 'conflict'
+
+
+class OrderCursorPagination(KeysetCursorPagination):
+    """
+    Cursor based pagination for the order list (`?pagination=cursor`), newest first.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering_fields = ['created_at']
+    default_ordering = '-created_at'
 
 
 class OrderViewSet(viewsets.ModelViewSet):
@@ -19,12 +53,21 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     Behaviors:
     - `list`: Returns all orders where the user is either the customer or the business.
+      Filters: `status`, `created_after`, `created_before`. `?pagination=cursor` (or a
+      `cursor` from a previous response) switches to `OrderCursorPagination`.
+      `?include_archived=1` also returns the orders moved to `ArchivedOrder`.
     - `create`: Creates a new order for a customer.
-    - `update` / `partial_update`: Updates an existing order.
+    - `update` / `partial_update`: Changes the order status along `Order.STATUS_TRANSITIONS`
+      (`in_progress` -> `completed` / `cancelled`) with one conditional UPDATE that only
+      writes `status` and `updated_at`. Disallowed transitions and lost races return 409.
     - `retrieve`: Not allowed. Returns 405 Method Not Allowed.
+    - `export` (`GET /orders/export/?export_format=csv|ndjson`): Streams the same orders
+      as `list` row by row as CSV (default) or NDJSON.
 
     Queryset:
     - Filters orders where the current user is either the `customer_user` or `business_user`.
+      The list is built as `UNION ALL` of a customer branch and a business branch, each
+      served by its own `(user, created_at)` index, instead of an `OR` across both columns.
 
     Serializers:
     - `OrderSerializer`: Used for create and list actions.
@@ -32,11 +75,61 @@ class OrderViewSet(viewsets.ModelViewSet):
     """
     permission_classes = [isUserFromTypeCustomer]
 
+    @property
+    def paginator(self):
+        """
+        Cursor pagination when requested, otherwise the full list as before.
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = OrderCursorPagination()
+            else:
+                self._paginator = None
+        return self._paginator
+
     def get_queryset(self):
-        user = self.request.user
         if self.action == 'list':
-            return Order.objects.filter(Q(customer_user=user) | Q(business_user=user))
+            branches = self.get_list_branches()
+            return branches[0].union(*branches[1:], all=True).order_by('id')
+        if self.action in ['update', 'partial_update']:
+            return Order.objects.only('id', 'business_user_id', 'customer_user_id', 'status', 'price', 'created_at')
         return Order.objects.all()
+
+    def get_list_branches(self):
+        """
+        Returns the disjoint customer and business branches of the current user's
+        orders with the list filters applied.
+
+        With `?include_archived=1` the same two branches over `ArchivedOrder` are
+        added; all branches then select the shared columns plus an `archived` flag.
+        """
+        user = self.request.user
+        conditions = build_order_filter(self.request.query_params)
+        models = [Order, ArchivedOrder] if include_archived(self.request.query_params) else [Order]
+
+        branches = []
+        for model in models:
+            branches += [
+                model.objects.filter(conditions, customer_user=user),
+                model.objects.filter(conditions, business_user=user).exclude(customer_user=user),
+            ]
+        if len(models) > 1:
+            branches = [
+                branch.annotate(archived=Value(branch.model is ArchivedOrder)).values(*ArchivedOrder.COPIED_FIELDS, 'archived')
+                for branch in branches
+            ]
+        return branches
+
+    def list(self, request, *args, **kwargs):
+        if self.paginator is None:
+            orders = self.get_queryset()
+        else:
+            orders = self.paginator.paginate_branches(self.get_list_branches(), request, view=self)
+        serializer = self.get_serializer(load_orders(orders), many=True)
+        if self.paginator is None:
+            return Response(serializer.data)
+        return self.paginator.get_paginated_response(serializer.data)
     
     def get_serializer_class(self):
         if self.action in ['create', 'list']:
@@ -48,10 +141,90 @@ class OrderViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         return Response({"detail": "Retrieving a single order is not allowed"}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    def update(self, request, *args, **kwargs):
+        """
+        Applies a status transition.
+
+        Only `id`, the two user ids and `status` are loaded for the permission
+        check. The status read there is the expected status of the conditional UPDATE,
+        so a concurrent change makes this request fail with 409 instead of
+        silently overwriting it.
+        """
+        order = self.get_object()
+        serializer = self.get_serializer(order, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+
+        new_status = serializer.validated_data.get('status', order.status)
+        if new_status != order.status:
+            if new_status not in Order.STATUS_TRANSITIONS[order.status]:
+                raise OrderStatusConflict(f"Cannot change status from {order.status} to {new_status}.")
+            if not order.change_status(new_status):
+                raise OrderStatusConflict()
+
+        return Response(OrderUpdateSerializer(Order.objects.get(pk=order.pk)).data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Streams all orders of the current user as a file download, followed by
+        the user's archived orders (`ArchivedOrder`) with the same columns.
+
+        Orders are fetched in chunks and written one row at a time, so memory use
+        stays flat regardless of the number of orders.
+        """
+        file_format = request.query_params.get('export_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            raise ValidationError({'export_format': [f"Must be one of: {', '.join(EXPORT_FORMATS)}."]})
+
+        user = request.user
+        user_filter = Q(customer_user=user) | Q(business_user=user)
+        querysets = [Order.objects.filter(user_filter), ArchivedOrder.objects.filter(user_filter)]
+        response = StreamingHttpResponse(iter_export(querysets, file_format), content_type=EXPORT_FORMATS[file_format])
+        response['Content-Disposition'] = f'attachment; filename="orders.{file_format}"'
+        return response
+
+def load_orders(rows):
+    """
+    Turns the `values()` rows of an `include_archived` list back into unsaved
+    `Order` / `ArchivedOrder` instances for the serializer. Model instances pass through.
+
+    The feature snapshots of the whole page are loaded with one extra query.
+    """
+    orders = [
+        (ArchivedOrder if row.pop('archived') else Order)(**row) if isinstance(row, dict) else row
+        for row in rows
+    ]
+    prefetch_related_objects(orders, 'feature_snapshot')
+    return orders
+
+
+def get_business_order_counts(business_user_id):
+    """
+    Returns the `BusinessOrderCounter` values of a business user as a dict.
+
+    Normally a single primary-key read (joined with the profile to check the type).
+    Business users without a counter row get one rebuilt from their orders.
+    Raises 404 if the user does not exist or is not a business user.
+    """
+    counts = BusinessOrderCounter.objects.filter(
+        pk=business_user_id, business_user__userprofile__type='business'
+    ).values(*BusinessOrderCounter.COUNTER_FIELDS).first()
+    if counts is not None:
+        return counts
+
+    business_user = get_object_or_404(User, id=business_user_id)
+    if getattr(business_user.userprofile, 'type', None) != 'business':
+        raise NotFound('User is not a business user')
+    BusinessOrderCounter.rebuild([business_user.pk])
+    return BusinessOrderCounter.objects.filter(pk=business_user.pk).values(*BusinessOrderCounter.COUNTER_FIELDS).get()
+
+
 class OrderCountView(APIView):
     """
     API view to get the count of `in_progress` orders for a given business user.
 
+    Reads the maintained `BusinessOrderCounter` instead of counting orders.
+
     Permissions:
     - Requires the user to be authenticated.
 
@@ -66,19 +239,16 @@ class OrderCountView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, business_user_id):
-        business_user = get_object_or_404(User, id=business_user_id)
-
-        if getattr(business_user.userprofile, 'type', None) != 'business':
-            return Response({'detail': 'User is not a business user'}, status=status.HTTP_404_NOT_FOUND)
-        
-        count = Order.objects.filter(business_user=business_user, status='in_progress').count()
-
-        return Response({'order_count': count}, status=status.HTTP_200_OK)
+        counts = get_business_order_counts(business_user_id)
+        return Response({'order_count': counts['in_progress']}, status=status.HTTP_200_OK)
 
 class CompletedOrderCountView(APIView):
     """
     API view to get the count of `completed` orders for a given business user.
 
+    Reads the maintained `BusinessOrderCounter` instead of counting orders.
+    Archived orders are only counted with `?include_archived=1`.
+
     Permissions:
     - Requires the user to be authenticated.
 
@@ -93,11 +263,242 @@ class CompletedOrderCountView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, business_user_id):
-        business_user = get_object_or_404(User, id=business_user_id)
+        counts = get_business_order_counts(business_user_id)
+        completed = counts['completed']
+        if include_archived(request.query_params):
+            completed += counts['archived_completed']
+        return Response({'completed_order_count': completed}, status=status.HTTP_200_OK)
+
+class BatchOrderCountView(APIView):
+    """
+    API view to get the order counts of many business users in one request.
+
+    Permissions:
+    - Requires the user to be authenticated.
+
+    Query Parameters:
+    - `business_user_ids`: Comma separated user ids (at most `max_ids`).
+    - `include_archived`: `1` to add the archived orders to the completed and cancelled counts.
+
+    Returns:
+    - HTTP 200 with one entry per requested id, in request order. Each entry has a
+      `status`: 200 with `order_count`, `completed_order_count` and `cancelled_order_count`,
+      or 404 with the same `detail` the single count endpoints would return.
+    - HTTP 400 if the ids are missing or not numbers.
+
+    All users, profile types and counters are read with a single query.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    max_ids = 100
+
+    def get(self, request):
+        ids = self.get_ids(request)
+        rows = {
+            row['pk']: row
+            for row in User.objects.filter(pk__in=ids).values(
+                'pk', 'userprofile__type',
+                *[f'order_counter__{field}' for field in BusinessOrderCounter.COUNTER_FIELDS]
+            )
+        }
+
+        missing_counters = [
+            pk for pk, row in rows.items()
+            if row['userprofile__type'] == 'business' and row['order_counter__in_progress'] is None
+        ]
+        if missing_counters:
+            BusinessOrderCounter.rebuild(missing_counters)
+            for counter in BusinessOrderCounter.objects.filter(pk__in=missing_counters).values():
+                rows[counter['business_user_id']].update(
+                    {f'order_counter__{field}': counter[field] for field in BusinessOrderCounter.COUNTER_FIELDS}
+                )
+
+        archived = include_archived(request.query_params)
+        return Response([self.get_entry(pk, rows.get(pk), archived) for pk in ids], status=status.HTTP_200_OK)
+
+    def get_ids(self, request):
+        raw = request.query_params.get('business_user_ids', '')
+        try:
+            ids = list(dict.fromkeys(int(value) for value in raw.split(',') if value.strip()))
+        except ValueError:
+            raise ValidationError({'business_user_ids': ["business_user_ids has to be a list of numbers"]})
+        if not ids:
+            raise ValidationError({'business_user_ids': ["This parameter is required."]})
+        if len(ids) > self.max_ids:
+            raise ValidationError({'business_user_ids': [f"At most {self.max_ids} ids per request."]})
+        return ids
+
+    def get_entry(self, pk, row, archived=False):
+        if row is None:
+            return {'business_user_id': pk, 'status': status.HTTP_404_NOT_FOUND, 'detail': 'No User matches the given query.'}
+        if row['userprofile__type'] != 'business':
+            return {'business_user_id': pk, 'status': status.HTTP_404_NOT_FOUND, 'detail': 'User is not a business user'}
+        completed, cancelled = row['order_counter__completed'], row['order_counter__cancelled']
+        if archived:
+            completed += row['order_counter__archived_completed']
+            cancelled += row['order_counter__archived_cancelled']
+        return {
+            'business_user_id': pk,
+            'status': status.HTTP_200_OK,
+            'order_count': row['order_counter__in_progress'],
+            'completed_order_count': completed,
+            'cancelled_order_count': cancelled,
+        }
+
+
+class OrderAnalyticsView(APIView):
+    """
+    API view for the revenue and order volume charts of a business user.
+
+    Reads only the `BusinessDailyRollup` rows of the range (one indexed range query),
+    never the orders themselves.
+
+    Permissions:
+    - Requires the user to be authenticated.
+    - Only the business user itself (or staff) may read its analytics.
+
+    Path Parameters:
+    - `business_user_id`: ID of the business user.
+
+    Query Parameters:
+    - `date_from`, `date_to`: inclusive ISO dates (default: the last 30 days, at most 366 days).
+
+    Returns:
+    - HTTP 200 with `totals` and one entry per day in `days` (days without orders are zero):
+      `order_count`, `in_progress`, `completed`, `cancelled`, `revenue` (completed orders)
+      and `avg_delivery_time` (days, `null` without orders).
+    - HTTP 400 for invalid dates, HTTP 403 for other users, HTTP 404 if the user is not a business user.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, business_user_id):
+        if request.user.id != business_user_id and not request.user.is_staff:
+            raise PermissionDenied('You can only view the analytics of your own business.')
+        if not User.objects.filter(pk=business_user_id, userprofile__type='business').exists():
+            raise NotFound('User is not a business user')
+        date_from, date_to = parse_analytics_range(request.query_params)
+
+        rollups = {
+            rollup.day: rollup
+            for rollup in BusinessDailyRollup.objects.filter(
+                business_user_id=business_user_id, day__gte=date_from, day__lte=date_to
+            )
+        }
+        totals = BusinessDailyRollup(business_user_id=business_user_id, day=date_to)
+        days = []
+        for offset in range((date_to - date_from).days + 1):
+            day = date_from + timedelta(days=offset)
+            rollup = rollups.get(day) or BusinessDailyRollup(business_user_id=business_user_id, day=day)
+            for field in BusinessDailyRollup.COUNTER_FIELDS:
+                setattr(totals, field, getattr(totals, field) + getattr(rollup, field))
+            days.append({'date': day, **self.get_values(rollup)})
+
+        return Response({
+            'business_user_id': business_user_id,
+            'date_from': date_from,
+            'date_to': date_to,
+            'totals': self.get_values(totals),
+            'days': days,
+        }, status=status.HTTP_200_OK)
+
+    def get_values(self, rollup):
+        return {
+            'order_count': rollup.order_count,
+            **{field: getattr(rollup, field) for field in BusinessDailyRollup.STATUS_FIELDS},
+            'revenue': rollup.revenue,
+            'avg_delivery_time': rollup.avg_delivery_time,
+        }
+
+
+class OrderEventTokenView(APIView):
+    """
+    Issues a short-lived token for the order event stream (`POST /api/orders/events/token/`).
+
+    Permissions:
+    - Requires the user to be authenticated.
+
+    Returns:
+    - HTTP 200 with `token` (pass it as `?token=` to `GET /api/orders/events/`) and
+      `expires_in` in seconds.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        return Response({
+            'token': make_stream_token(request.user.id),
+            'expires_in': get_order_event_settings()['STREAM_TOKEN_MAX_AGE'],
+        }, status=status.HTTP_200_OK)
+
+
+class OrderEventStreamView(View):
+    """
+    Server-Sent Events stream of the current user's orders (`GET /api/orders/events/`).
+
+    Authentication:
+    - `Authorization: Token <key>` header, or `?token=<stream token>` for `EventSource`
+      clients that cannot set headers. Stream tokens come from `OrderEventTokenView`,
+      only open this stream and expire after `STREAM_TOKEN_MAX_AGE` seconds, so a
+      reconnecting client fetches a new one; the API key is never accepted in the URL.
+
+    Events:
+    - `order_created` and `order_status_changed` for orders where the user is the
+      customer or the business user. `data` is JSON with `order_id`, `status`,
+      `updated_at` and `title` / `previous_status`.
+    - Every event has an `id`; reconnecting clients send `Last-Event-ID` (or
+      `?last_event_id=`) and receive what they missed, within the retention window.
+
+    Needs the ASGI entrypoint (`core/asgi.py`); under WSGI it answers 501.
+    """
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({'detail': 'The event stream requires the ASGI server (core.asgi).'}, status=501)
+
+        user_id = await self.authenticate(request)
+        if user_id is None:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+        last_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+        try:
+            last_id = int(last_id) if last_id else await self.get_latest_event_id()
+        except ValueError:
+            return JsonResponse({'detail': 'Invalid Last-Event-ID.'}, status=400)
+
+        response = StreamingHttpResponse(self.stream(user_id, last_id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def authenticate(self, request):
+        header = request.headers.get('Authorization', '')
+        if header.startswith('Token '):
+            users = Token.objects.filter(key=header[len('Token '):], user__is_active=True).values_list('user_id', flat=True)
+        else:
+            user_id = read_stream_token(request.GET.get('token', ''))
+            if user_id is None:
+                return None
+            users = User.objects.filter(pk=user_id, is_active=True).values_list('pk', flat=True)
+        return await sync_to_async(users.first)()
 
-        if getattr(business_user.userprofile, 'type', None) != 'business':
-            return Response({'detail': 'User is not a business user'}, status=status.HTTP_404_NOT_FOUND)
-        
-        count = Order.objects.filter(business_user=business_user, status='completed').count()
+    @sync_to_async
+    def get_latest_event_id(self):
+        return OrderEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
 
-        return Response({'completed_order_count': count}, status=status.HTTP_200_OK)
\ No newline at end of file
+    async def stream(self, user_id, last_id):
+        options = get_order_event_settings()
+        yield f"retry: {options['RETRY']}\n\n"
+        last_sent = time.monotonic()
+        while True:
+            events = await sync_to_async(OrderEvent.for_user, thread_sensitive=False)(user_id, last_id)
+            for event in events:
+                last_id = event.id
+                yield f"id: {event.id}\nevent: {event.event}\ndata: {json.dumps(event.data)}\n\n"
+                last_sent = time.monotonic()
+            if events:
+                continue
+            if time.monotonic() - last_sent >= options['HEARTBEAT']:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            await order_event_bus.wait(options['POLL_INTERVAL'])
@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+DEFAULT_ORDER_ARCHIVE_SETTINGS = {
+    'AGE_DAYS': 180,
+    'BATCH_SIZE': 1000,
+}
+
+
+def get_order_archive_settings():
+    """
+    Returns `settings.ORDER_ARCHIVE` merged over the defaults.
+    """
+    return {**DEFAULT_ORDER_ARCHIVE_SETTINGS, **getattr(settings, 'ORDER_ARCHIVE', {})}
+
+
+def get_archive_cutoff(age_days=None):
+    """
+    Orders last updated before this moment are old enough to be archived.
+    """
+    if age_days is None:
+        age_days = get_order_archive_settings()['AGE_DAYS']
+    return timezone.now() - timedelta(days=age_days)
+
+
+def include_archived(query_params):
+    """
+    True if the request asks for archived orders (`?include_archived=1`).
+    """
+    return query_params.get('include_archived', '').lower() in ('1', 'true', 'yes')
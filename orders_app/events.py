@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.core import signing
+
+DEFAULT_ORDER_EVENT_SETTINGS = {
+    'POLL_INTERVAL': 2,
+    'HEARTBEAT': 15,
+    'RETRY': 3000,
+    'RETENTION': 24 * 60 * 60,
+    'STREAM_TOKEN_MAX_AGE': 60,
+}
+STREAM_TOKEN_SALT = 'orders_app.events.stream'
+
+
+def get_order_event_settings():
+    """
+    Returns `settings.ORDER_EVENTS` merged over the defaults.
+    """
+    return {**DEFAULT_ORDER_EVENT_SETTINGS, **getattr(settings, 'ORDER_EVENTS', {})}
+
+
+def make_stream_token(user_id):
+    """
+    Returns a signed, timestamped token that only opens the event stream of `user_id`.
+
+    Used as `?token=` by `EventSource` clients instead of the API key, which would
+    otherwise end up in access logs and browser history.
+    """
+    return signing.dumps(user_id, salt=STREAM_TOKEN_SALT)
+
+
+def read_stream_token(token):
+    """
+    Returns the user id of a stream token, or None if it is invalid or older than
+    `STREAM_TOKEN_MAX_AGE` seconds.
+    """
+    try:
+        return signing.loads(token, salt=STREAM_TOKEN_SALT, max_age=get_order_event_settings()['STREAM_TOKEN_MAX_AGE'])
+    except signing.BadSignature:
+        return None
+
+
+class LocalEventBus:
+    """
+    In-process wake-up for the SSE streams.
+
+    Publishers (sync code in any thread) call `notify()`; every stream waiting in
+    `wait()` on any event loop of this process is woken up and re-reads the
+    `OrderEvent` table. Streams in other processes fall back to polling.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = set()
+
+    def notify(self):
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    async def wait(self, timeout):
+        """
+        Returns after the next `notify()` or after `timeout` seconds.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+order_event_bus = LocalEventBus()
@@ -0,0 +1,78 @@
+import csv
+import json
+from itertools import chain
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FIELDS = [
+    'id', 'customer_user', 'business_user', 'title', 'revisions', 'delivery_time_in_days',
+    'price', 'features', 'offer_type', 'status', 'created_at', 'updated_at'
+]
+EXPORT_COLUMNS = {
+    'customer_user': 'customer_user_id',
+    'business_user': 'business_user_id',
+    'features': 'feature_snapshot__features',
+}
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    File-like object for `csv.writer` that returns the written line instead of buffering it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_order_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields one dict per order (`Order` or `ArchivedOrder`, which share the exported
+    columns) in `EXPORT_FIELDS` order.
+
+    Uses `values_list(...).iterator()`, so rows are fetched in chunks of `chunk_size`
+    (a server-side cursor on PostgreSQL) and no model instances are built. `features`
+    comes from the joined `FeatureSnapshot`, or the inline column for rows not yet deduplicated.
+    """
+    columns = [EXPORT_COLUMNS.get(field, field) for field in EXPORT_FIELDS] + ['features']
+    rows = queryset.order_by('id').values_list(*columns).iterator(chunk_size=chunk_size)
+    for row in rows:
+        row = dict(zip(EXPORT_FIELDS + ['inline_features'], row))
+        inline_features = row.pop('inline_features')
+        if row['features'] is None:
+            row['features'] = inline_features
+        yield row
+
+
+def iter_csv(rows):
+    """
+    Renders rows as CSV lines, header first. `features` is written as a JSON list.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        row['features'] = json.dumps(row['features'], ensure_ascii=False)
+        row['created_at'] = row['created_at'].isoformat()
+        row['updated_at'] = row['updated_at'].isoformat()
+        yield writer.writerow([row[field] for field in EXPORT_FIELDS])
+
+
+def iter_ndjson(rows):
+    """
+    Renders rows as newline-delimited JSON, one order per line.
+    """
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def iter_export(querysets, file_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Renders the rows of `querysets` one after another (e.g. live orders, then the
+    archived ones), each read in its own chunked pass.
+    """
+    rows = chain.from_iterable(iter_order_rows(queryset, chunk_size) for queryset in querysets)
+    return iter_csv(rows) if file_format == 'csv' else iter_ndjson(rows)
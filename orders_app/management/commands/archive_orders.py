@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from orders_app.archive import get_archive_cutoff, get_order_archive_settings
+from orders_app.models import ArchivedOrder
+
+
+class Command(BaseCommand):
+    """
+    Moves completed and cancelled orders that were last updated more than
+    `ORDER_ARCHIVE['AGE_DAYS']` days ago into `ArchivedOrder`.
+
+    Works in batches of `ORDER_ARCHIVE['BATCH_SIZE']` orders, one transaction each,
+    so it can run in the background (e.g. nightly via cron) next to live traffic
+    and can be interrupted at any time.
+    """
+
+    help = "Moves old completed and cancelled orders into the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, help="Overrides ORDER_ARCHIVE['AGE_DAYS'].")
+        parser.add_argument('--batch-size', type=int, help="Overrides ORDER_ARCHIVE['BATCH_SIZE'].")
+        parser.add_argument('--max-batches', type=int, help="Stop after this many batches.")
+
+    def handle(self, *args, **options):
+        archive_settings = get_order_archive_settings()
+        cutoff = get_archive_cutoff(options['older_than_days'])
+        batch_size = options['batch_size'] or archive_settings['BATCH_SIZE']
+
+        total = batches = 0
+        while options['max_batches'] is None or batches < options['max_batches']:
+            archived = ArchivedOrder.archive_batch(cutoff, batch_size)
+            if not archived:
+                break
+            total += archived
+            batches += 1
+            self.stdout.write(f"Archived batch {batches} ({archived} orders).")
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} orders."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from orders_app.models import ArchivedOrder, FeatureSnapshot, Order
+
+
+class Command(BaseCommand):
+    """
+    Backfill for `FeatureSnapshot`: moves the inline `features` of existing orders
+    and archived orders into shared snapshots, in batches of one transaction each.
+
+    Safe to interrupt and re-run; converted rows are skipped.
+    """
+
+    help = "Deduplicates the features of existing orders into feature snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for model in [Order, ArchivedOrder]:
+            total = 0
+            while True:
+                converted = FeatureSnapshot.deduplicate_batch(model, options['batch_size'])
+                if not converted:
+                    break
+                total += converted
+            self.stdout.write(f"{model.__name__}: {total} rows deduplicated.")
+        self.stdout.write(self.style.SUCCESS(f"{FeatureSnapshot.objects.count()} feature snapshots in total."))
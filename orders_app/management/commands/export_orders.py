@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from orders_app.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, iter_export
+from orders_app.models import ArchivedOrder, Order
+from user_auth_app.lookup import get_business_user
+
+
+class Command(BaseCommand):
+    """
+    Writes the order history of a business user as CSV or NDJSON, row by row.
+
+    Orders are read in chunks (`--chunk-size`), so memory use does not depend on
+    the number of orders. Archived orders follow the live ones.
+    """
+
+    help = "Exports the orders of a business user as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help="Username or id of the business user.")
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', help="Target file. Defaults to stdout.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        user = get_business_user(options['user'])
+        querysets = [Order.objects.filter(business_user=user), ArchivedOrder.objects.filter(business_user=user)]
+        chunks = iter_export(querysets, options['format'], options['chunk_size'])
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as file:
+                file.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
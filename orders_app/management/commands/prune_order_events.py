@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from orders_app.events import get_order_event_settings
+from orders_app.models import OrderEvent
+
+
+class Command(BaseCommand):
+    """
+    Deletes order events older than `ORDER_EVENTS['RETENTION']` seconds.
+
+    Clients that reconnect after a longer gap only receive newer events.
+    """
+
+    help = "Deletes order events that are older than the retention window."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=get_order_event_settings()['RETENTION'])
+        deleted, _ = OrderEvent.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} order events."))
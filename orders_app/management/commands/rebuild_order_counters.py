@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from orders_app.models import BusinessOrderCounter
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the per-business order status counters from the orders table.
+
+    Safe to run at any time; intended for repairing drift and for backfills.
+    """
+
+    help = "Rebuilds the per-business order status counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help="Only this business user id (repeatable).")
+
+    def handle(self, *args, **options):
+        rebuilt = BusinessOrderCounter.rebuild(options['users'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} order counters."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from orders_app.models import BusinessDailyRollup
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the daily per-business order rollups from the orders and archived orders.
+
+    Safe to run at any time; intended for repairing drift and for backfills.
+    """
+
+    help = "Rebuilds the daily per-business order rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help="Only this business user id (repeatable).")
+
+    def handle(self, *args, **options):
+        rebuilt = BusinessDailyRollup.rebuild(options['users'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} daily order rollups."))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.3 on 2026-10-18 04:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+STATUSES = ['in_progress', 'completed', 'cancelled']
+
+
+def fill_order_counters(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    Order = apps.get_model('orders_app', 'Order')
+    BusinessOrderCounter = apps.get_model('orders_app', 'BusinessOrderCounter')
+
+    counts = {
+        row['business_user_id']: row
+        for row in Order.objects.values('business_user_id')
+        .annotate(**{status: Count('id', filter=Q(status=status)) for status in STATUSES})
+    }
+    business_ids = User.objects.filter(userprofile__type='business').values_list('pk', flat=True)
+    BusinessOrderCounter.objects.bulk_create([
+        BusinessOrderCounter(business_user_id=pk, **{status: counts.get(pk, {}).get(status, 0) for status in STATUSES})
+        for pk in business_ids
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('orders_app', '0001_initial'),
+        ('user_auth_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessOrderCounter',
+            fields=[
+                ('business_user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('in_progress', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('cancelled', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(fill_order_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.3 on 2026-10-18 04:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers_app', '0001_initial'),
+        ('orders_app', '0004_order_event'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businessordercounter',
+            name='archived_cancelled',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='businessordercounter',
+            name='archived_completed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('revisions', models.IntegerField()),
+                ('delivery_time_in_days', models.IntegerField()),
+                ('price', models.IntegerField()),
+                ('features', models.JSONField()),
+                ('offer_type', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('in_progress', 'In Progress'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=50)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('business_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('customer_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('offer_detail', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='offers_app.offerdetail')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['customer_user', 'created_at'], name='archived_customer_created_idx'), models.Index(fields=['business_user', 'created_at'], name='archived_business_created_idx')],
+            },
+        ),
+    ]
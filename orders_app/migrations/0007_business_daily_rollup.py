@@ -0,0 +1,64 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+STATUSES = ['in_progress', 'completed', 'cancelled']
+FIELDS = ['order_count', *STATUSES, 'revenue', 'delivery_time_total']
+
+
+def fill_daily_rollups(apps, schema_editor):
+    BusinessDailyRollup = apps.get_model('orders_app', 'BusinessDailyRollup')
+
+    rollups = {}
+    for model_name in ['Order', 'ArchivedOrder']:
+        rows = apps.get_model('orders_app', model_name).objects.annotate(day=TruncDate('created_at')).values(
+            'business_user_id', 'day'
+        ).annotate(
+            order_count=Count('id'),
+            revenue=Sum('price', filter=Q(status='completed'), default=0),
+            delivery_time_total=Sum('delivery_time_in_days', default=0),
+            **{status: Count('id', filter=Q(status=status)) for status in STATUSES}
+        ).order_by()
+        for row in rows:
+            rollup = rollups.setdefault((row['business_user_id'], row['day']), dict.fromkeys(FIELDS, 0))
+            for field in FIELDS:
+                rollup[field] += row[field]
+
+    BusinessDailyRollup.objects.bulk_create([
+        BusinessDailyRollup(business_user_id=business_user_id, day=day, **values)
+        for (business_user_id, day), values in rollups.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders_app', '0006_feature_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('in_progress', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('cancelled', models.PositiveIntegerField(default=0)),
+                ('revenue', models.PositiveBigIntegerField(default=0)),
+                ('delivery_time_total', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_order_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('business_user', 'day'), name='rollup_business_day_unique')],
+            },
+        ),
+        migrations.RunPython(fill_daily_rollups, migrations.RunPython.noop),
+    ]
@@ -1,17 +1,107 @@
-from django.db import models
+import hashlib
+import json
+
+from django.db import DatabaseError, connections, models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Greatest, TruncDate
 from django.contrib.auth.models import User
+from django.utils import timezone
 from offers_app.models import OfferDetail
+from orders_app.events import order_event_bus
 
 
 # Create your models here.
 
-class Order(models.Model):
+class FeatureSnapshot(models.Model):
+    """
+    One distinct `features` list, stored once and referenced by every order that
+    was placed with it.
+
+    `digest` is the SHA-256 of the canonical JSON (`feature_digest`), so identical
+    lists from any offer detail share one row.
+    """
+
+    digest = models.CharField(max_length=64, unique=True)
+    features = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Features {self.digest[:12]}"
+
+    @staticmethod
+    def feature_digest(features):
+        canonical = json.dumps(features, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def for_features(cls, features):
+        """
+        Returns the snapshot of `features`, creating it on first use.
+        """
+        snapshot, _ = cls.objects.get_or_create(digest=cls.feature_digest(features), defaults={'features': features})
+        return snapshot
+
+    @classmethod
+    def ids_for(cls, feature_lists):
+        """
+        Returns `{digest: snapshot id}` for many feature lists with one insert and one select.
+        """
+        snapshots = {cls.feature_digest(features): features for features in feature_lists}
+        cls.objects.bulk_create(
+            [cls(digest=digest, features=features) for digest, features in snapshots.items()],
+            ignore_conflicts=True
+        )
+        return dict(cls.objects.filter(digest__in=snapshots).values_list('digest', 'id'))
+
+    @classmethod
+    def deduplicate_batch(cls, model, batch_size):
+        """
+        Moves the inline `features` of up to `batch_size` rows of `model` (`Order` or
+        `ArchivedOrder`) without a snapshot into `FeatureSnapshot`, in one transaction.
+
+        The rows then reference the snapshot and their `features` column is cleared.
+        Returns the number of rows converted.
+        """
+        with transaction.atomic():
+            rows = list(
+                model.objects.filter(feature_snapshot__isnull=True).order_by('id').values_list('id', 'features')[:batch_size]
+            )
+            if not rows:
+                return 0
+            snapshot_ids = cls.ids_for(features for _, features in rows)
+            model.objects.bulk_update(
+                [model(id=pk, features=None, feature_snapshot_id=snapshot_ids[cls.feature_digest(features)])
+                 for pk, features in rows],
+                ['features', 'feature_snapshot']
+            )
+        return len(rows)
+
+
+class SnapshotFeaturesMixin:
+    """
+    `snapshot_features`: the order's features from its `FeatureSnapshot`, or from the
+    legacy inline `features` column for rows not yet deduplicated.
+    """
+
+    @property
+    def snapshot_features(self):
+        if self.feature_snapshot_id is None:
+            return self.features
+        return self.feature_snapshot.features
+
+
+class Order(SnapshotFeaturesMixin, models.Model):
 
     STATUS_CHOICES = [
         ("in_progress", "In Progress"),
         ("completed", "Completed"),
         ("cancelled", "Cancelled")
     ]
+    STATUS_TRANSITIONS = {
+        "in_progress": ["completed", "cancelled"],
+        "completed": [],
+        "cancelled": [],
+    }
     customer_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='orders')
     business_user = models.ForeignKey(User, on_delete=models.CASCADE)
     offer_detail = models.ForeignKey(OfferDetail, on_delete=models.CASCADE)
@@ -20,11 +110,450 @@ class Order(models.Model):
     revisions = models.IntegerField()
     delivery_time_in_days = models.IntegerField()
     price = models.IntegerField()
-    features = models.JSONField()
+    features = models.JSONField(null=True, blank=True)
+    feature_snapshot = models.ForeignKey(FeatureSnapshot, on_delete=models.PROTECT, null=True, blank=True, related_name='+')
     offer_type = models.CharField(max_length=255)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='in_progress')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['business_user', 'status'], name='order_business_status_idx'),
+            models.Index(fields=['customer_user', 'created_at'], name='order_customer_created_idx'),
+            models.Index(fields=['business_user', 'created_at'], name='order_business_created_idx'),
+        ]
+
+    # Database values kept as `_loaded_<field>`, so the signals can book the difference.
+    LOADED_FIELDS = ['status', 'price', 'delivery_time_in_days']
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded(cls.LOADED_FIELDS)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self.remember_loaded([field for field in self.LOADED_FIELDS if fields is None or field in fields])
+
+    def remember_loaded(self, fields):
+        for field in fields:
+            if field in self.__dict__:
+                setattr(self, f'_loaded_{field}', self.__dict__[field])
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the order and its `BusinessOrderCounter` / `BusinessDailyRollup` changes
+        (see `orders_app.signals`) in one transaction.
+        """
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        self.remember_loaded([field for field in self.LOADED_FIELDS if update_fields is None or field in update_fields])
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            return super().delete(*args, **kwargs)
+
+    def change_status(self, new_status):
+        """
+        Moves the order from its current (loaded) `status` to `new_status` with one
+        conditional `UPDATE ... WHERE status = <loaded status>` that writes only `status`
+        and `updated_at`. The `BusinessOrderCounter` change and the `OrderEvent` are
+        written in the same transaction.
+
+        Returns False if the order no longer has the loaded status (a concurrent
+        change won); nothing is written in that case. The transition itself is
+        checked by the caller against `STATUS_TRANSITIONS`.
+
+        Needs `pk`, `status`, `business_user_id`, `customer_user_id`, `price` and
+        `created_at` to be loaded.
+        """
+        expected_status = self.status
+        updated_at = timezone.now()
+        with transaction.atomic():
+            updated = Order.objects.filter(pk=self.pk, status=expected_status).update(
+                status=new_status, updated_at=updated_at
+            )
+            if updated:
+                self.status, self.updated_at = new_status, updated_at
+                self._loaded_status = new_status
+                BusinessOrderCounter.apply(self.business_user_id, {expected_status: -1, new_status: 1})
+                BusinessDailyRollup.apply_order(self, previous_status=expected_status)
+                OrderEvent.publish(OrderEvent.STATUS_CHANGED, self, previous_status=expected_status)
+        return bool(updated)
+
+    def __str__(self):
+        return f"Order {self.id} - {self.title} by {self.customer_user.username} for {self.business_user.username}"
+
+
+class BusinessOrderCounter(models.Model):
+    """
+    Number of orders per status for one business user.
+
+    Maintained by the `Order` signals in the same transaction as the order write,
+    so the count endpoints read one row instead of counting orders. The `archived_*`
+    fields count the rows moved to `ArchivedOrder` (see `archive_orders`).
+    `python manage.py rebuild_order_counters` recomputes all rows from the orders.
+    """
+
+    STATUS_FIELDS = [status for status, _ in Order.STATUS_CHOICES]
+    ARCHIVED_FIELDS = ['archived_completed', 'archived_cancelled']
+    COUNTER_FIELDS = STATUS_FIELDS + ARCHIVED_FIELDS
+
+    business_user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='order_counter')
+    in_progress = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    cancelled = models.PositiveIntegerField(default=0)
+    archived_completed = models.PositiveIntegerField(default=0)
+    archived_cancelled = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
-        return f"Order {self.id} - {self.title} by {self.customer_user.username} for {self.business_user.username}"
\ No newline at end of file
+        return f"Order counter for {self.business_user_id}"
+
+    @classmethod
+    def apply(cls, business_user_id, changes, create=True):
+        """
+        Adds the `{field: delta}` changes (`COUNTER_FIELDS`) to the counter row of a business user.
+
+        The row is created if needed unless `create` is False (used for deletes, where
+        the user itself may be going away). Counters never drop below zero.
+        """
+        changes = {status: delta for status, delta in changes.items() if delta and status in cls.COUNTER_FIELDS}
+        if not changes:
+            return
+        values = {status: Greatest(F(status) + delta, 0) for status, delta in changes.items()}
+        updated = cls.objects.filter(pk=business_user_id).update(updated_at=timezone.now(), **values)
+        if not updated and create:
+            cls.objects.get_or_create(business_user_id=business_user_id)
+            cls.objects.filter(pk=business_user_id).update(updated_at=timezone.now(), **values)
+
+    @classmethod
+    def rebuild(cls, business_user_ids=None):
+        """
+        Recomputes the counters from the orders with one grouped query.
+
+        Covers every business user (or only `business_user_ids`), including those
+        without orders. Returns the number of counter rows written.
+        """
+        users = User.objects.filter(userprofile__type='business')
+        if business_user_ids is not None:
+            users = users.filter(pk__in=business_user_ids)
+
+        counts = {}
+        for model, prefix in [(Order, ''), (ArchivedOrder, 'archived_')]:
+            rows = model.objects.filter(business_user__in=users).values('business_user_id').annotate(
+                **{f'{prefix}{status}': Count('id', filter=Q(status=status)) for status in cls.STATUS_FIELDS}
+            )
+            for row in rows:
+                counts.setdefault(row.pop('business_user_id'), {}).update(row)
+
+        counters = [
+            cls(business_user_id=pk, **{field: counts.get(pk, {}).get(field, 0) for field in cls.COUNTER_FIELDS})
+            for pk in users.values_list('pk', flat=True)
+        ]
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                counters,
+                update_conflicts=True,
+                unique_fields=['business_user'],
+                update_fields=cls.COUNTER_FIELDS + ['updated_at'],
+            )
+        return len(counters)
+
+
+class BusinessDailyRollup(models.Model):
+    """
+    Orders of one business user placed on one day (`created_at` in the current time zone).
+
+    - `order_count`, `in_progress`, `completed`, `cancelled`: orders by current status.
+    - `revenue`: sum of `price` of the completed orders.
+    - `delivery_time_total`: sum of `delivery_time_in_days`, for the daily average.
+
+    Maintained by the `Order` signals and `Order.change_status` in the same transaction
+    as the order write; `price` and `delivery_time_in_days` edits saved on an existing
+    order are booked as differences. Archiving does not touch the rollups, so they keep
+    covering archived orders. `python manage.py rebuild_order_rollups` recomputes them.
+    """
+
+    STATUS_FIELDS = BusinessOrderCounter.STATUS_FIELDS
+    COUNTER_FIELDS = ['order_count'] + STATUS_FIELDS + ['revenue', 'delivery_time_total']
+
+    business_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_order_rollups')
+    day = models.DateField()
+    order_count = models.PositiveIntegerField(default=0)
+    in_progress = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    cancelled = models.PositiveIntegerField(default=0)
+    revenue = models.PositiveBigIntegerField(default=0)
+    delivery_time_total = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['business_user', 'day'], name='rollup_business_day_unique'),
+        ]
+
+    def __str__(self):
+        return f"Orders of {self.business_user_id} on {self.day}"
+
+    @property
+    def avg_delivery_time(self):
+        return round(self.delivery_time_total / self.order_count, 2) if self.order_count else None
+
+    @classmethod
+    def apply(cls, business_user_id, day, changes, create=True):
+        """
+        Adds the `{field: delta}` changes (`COUNTER_FIELDS`) to the rollup row of a
+        business user and day, like `BusinessOrderCounter.apply`.
+        """
+        changes = {field: delta for field, delta in changes.items() if delta and field in cls.COUNTER_FIELDS}
+        if not changes:
+            return
+        values = {field: Greatest(F(field) + delta, 0) for field, delta in changes.items()}
+        rows = cls.objects.filter(business_user_id=business_user_id, day=day)
+        updated = rows.update(updated_at=timezone.now(), **values)
+        if not updated and create:
+            cls.objects.get_or_create(business_user_id=business_user_id, day=day)
+            rows.update(updated_at=timezone.now(), **values)
+
+    @classmethod
+    def apply_order(cls, order, previous_status=None, sign=1, status=None):
+        """
+        Books a new order (`previous_status` None), a status change, or with `sign=-1`
+        the removal of an order into the rollup of its creation day. `status`
+        overrides `order.status` (the status the order has in the database).
+        """
+        status = status or order.status
+        revenue = order.price if status == 'completed' else 0
+        if previous_status is None:
+            changes = {
+                'order_count': sign,
+                status: sign,
+                'revenue': sign * revenue,
+                'delivery_time_total': sign * order.delivery_time_in_days,
+            }
+        else:
+            changes = {previous_status: -1, status: 1}
+            changes['revenue'] = revenue - (order.price if previous_status == 'completed' else 0)
+        cls.apply(order.business_user_id, timezone.localdate(order.created_at), changes, create=sign > 0)
+
+    @classmethod
+    def apply_order_edit(cls, order, status, previous_price=None, previous_delivery_time=None):
+        """
+        Books an edited `price` / `delivery_time_in_days` of an order that had `status`
+        into the rollup of its creation day. The previous values are None for fields
+        that were not saved; `price` only counts towards `revenue` of completed orders.
+        """
+        changes = {}
+        if previous_price is not None and status == 'completed':
+            changes['revenue'] = order.price - previous_price
+        if previous_delivery_time is not None:
+            changes['delivery_time_total'] = order.delivery_time_in_days - previous_delivery_time
+        if any(changes.values()):
+            cls.apply(order.business_user_id, timezone.localdate(order.created_at), changes)
+
+    @classmethod
+    def rebuild(cls, business_user_ids=None):
+        """
+        Recomputes the rollups from the orders and archived orders with one grouped
+        query per table. Returns the number of rollup rows written.
+
+        Runs in one transaction. The rollup rows being replaced are locked first
+        (`select_for_update`, a no-op on SQLite), so order writes that book into them
+        either finish before the orders are aggregated or wait for the new rows.
+        """
+        with transaction.atomic():
+            existing = cls.objects.all()
+            if business_user_ids is not None:
+                existing = existing.filter(business_user__in=business_user_ids)
+            list(existing.select_for_update().values_list('pk', flat=True))
+
+            rollups = {}
+            for model in [Order, ArchivedOrder]:
+                orders = model.objects.all()
+                if business_user_ids is not None:
+                    orders = orders.filter(business_user__in=business_user_ids)
+                rows = orders.annotate(day=TruncDate('created_at')).values('business_user_id', 'day').annotate(
+                    order_count=Count('id'),
+                    revenue=Sum('price', filter=Q(status='completed'), default=0),
+                    delivery_time_total=Sum('delivery_time_in_days', default=0),
+                    **{status: Count('id', filter=Q(status=status)) for status in cls.STATUS_FIELDS}
+                ).order_by()
+                for row in rows:
+                    rollup = rollups.setdefault((row['business_user_id'], row['day']), dict.fromkeys(cls.COUNTER_FIELDS, 0))
+                    for field in cls.COUNTER_FIELDS:
+                        rollup[field] += row[field]
+
+            existing.delete()
+            cls.objects.bulk_create([
+                cls(business_user_id=business_user_id, day=day, **values)
+                for (business_user_id, day), values in rollups.items()
+            ], batch_size=1000)
+        return len(rollups)
+
+
+def delete_rows(model, ids):
+    """
+    Deletes the rows of `model` with the given primary keys in one `DELETE` statement,
+    without loading them, cascading or sending signals. Returns the number of deleted rows.
+
+    Only for tables nothing else has a foreign key to.
+    """
+    if not ids:
+        return 0
+    connection = connections[model.objects.db]
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({placeholders})',
+            list(ids)
+        )
+        return cursor.rowcount
+
+
+class ArchivedOrder(SnapshotFeaturesMixin, models.Model):
+    """
+    Completed and cancelled orders moved out of the hot `Order` table by
+    `python manage.py archive_orders`.
+
+    Same columns and ids as `Order` plus `archived_at`. Archived orders are read-only;
+    the list and count endpoints include them with `?include_archived=1`.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    customer_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    business_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    offer_detail = models.ForeignKey(OfferDetail, on_delete=models.CASCADE, related_name='+')
+
+    title = models.CharField(max_length=255)
+    revisions = models.IntegerField()
+    delivery_time_in_days = models.IntegerField()
+    price = models.IntegerField()
+    features = models.JSONField(null=True, blank=True)
+    feature_snapshot = models.ForeignKey(FeatureSnapshot, on_delete=models.PROTECT, null=True, blank=True, related_name='+')
+    offer_type = models.CharField(max_length=255)
+    status = models.CharField(max_length=50, choices=Order.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    COPIED_FIELDS = [
+        'id', 'customer_user_id', 'business_user_id', 'offer_detail_id', 'title', 'revisions',
+        'delivery_time_in_days', 'price', 'features', 'feature_snapshot_id', 'offer_type', 'status',
+        'created_at', 'updated_at'
+    ]
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['customer_user', 'created_at'], name='archived_customer_created_idx'),
+            models.Index(fields=['business_user', 'created_at'], name='archived_business_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived order {self.id} - {self.title}"
+
+    @classmethod
+    def archive_batch(cls, cutoff, batch_size):
+        """
+        Moves up to `batch_size` completed / cancelled orders last updated before
+        `cutoff` into the archive, in one transaction.
+
+        The rows are copied with one INSERT and removed with one DELETE (no per-order
+        signals); the counters move from `completed` / `cancelled` to the matching
+        `archived_*` fields. The selected orders are locked (`select_for_update`, a
+        no-op on SQLite) and the transaction is rolled back unless exactly these
+        orders were copied and deleted. Returns the number of archived orders.
+        """
+        with transaction.atomic():
+            ids = list(
+                Order.objects.select_for_update()
+                .filter(status__in=['completed', 'cancelled'], updated_at__lt=cutoff)
+                .order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return 0
+
+            rows = Order.objects.filter(pk__in=ids).values(*cls.COPIED_FIELDS)
+            cls.objects.bulk_create([cls(**row) for row in rows])
+            copied = cls.objects.filter(pk__in=ids).count()
+            if copied != len(ids):
+                raise DatabaseError(f"Archived {copied} of {len(ids)} orders; batch rolled back.")
+
+            moved = Order.objects.filter(pk__in=ids).values('business_user_id', 'status').annotate(count=Count('id'))
+            for row in moved:
+                BusinessOrderCounter.apply(
+                    row['business_user_id'],
+                    {row['status']: -row['count'], f"archived_{row['status']}": row['count']}
+                )
+            # No `QuerySet.delete()`: its post_delete (`count_deleted_order`) would book the
+            # orders a second time on top of the counter move above and take them out of
+            # the rollups, and disconnecting it would also mute concurrent requests.
+            deleted = delete_rows(Order, ids)
+            if deleted != len(ids):
+                raise DatabaseError(f"Deleted {deleted} of {len(ids)} archived orders; batch rolled back.")
+        return len(ids)
+
+
+class OrderEvent(models.Model):
+    """
+    Outbox of order events for the SSE stream (`OrderEventStreamView`).
+
+    Rows are written in the same transaction as the order change and read by every
+    subscribed stream with `WHERE user = ? AND id > last_seen`, so the database is
+    the event bus and no external broker is needed. Streams in the same process are
+    woken up immediately after commit; others notice on their next poll.
+    """
+
+    CREATED = 'order_created'
+    STATUS_CHANGED = 'order_status_changed'
+    EVENT_CHOICES = [
+        (CREATED, 'Order created'),
+        (STATUS_CHANGED, 'Order status changed'),
+    ]
+
+    event = models.CharField(max_length=50, choices=EVENT_CHOICES)
+    order_id = models.BigIntegerField()
+    customer_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    business_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['customer_user', 'id'], name='orderevent_customer_idx'),
+            models.Index(fields=['business_user', 'id'], name='orderevent_business_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event} for order {self.order_id}"
+
+    @classmethod
+    def publish(cls, event, order, **extra):
+        """
+        Stores an event for both parties of `order` and wakes up local streams on commit.
+        """
+        record = cls.objects.create(
+            event=event,
+            order_id=order.pk,
+            customer_user_id=order.customer_user_id,
+            business_user_id=order.business_user_id,
+            data={
+                'order_id': order.pk,
+                'status': order.status,
+                'updated_at': order.updated_at.isoformat() if order.updated_at else None,
+                **extra,
+            },
+        )
+        transaction.on_commit(order_event_bus.notify)
+        return record
+
+    @classmethod
+    def for_user(cls, user_id, after_id, limit=100):
+        return list(
+            cls.objects.filter(Q(customer_user_id=user_id) | Q(business_user_id=user_id), id__gt=after_id)
+            .order_by('id')[:limit]
+        )
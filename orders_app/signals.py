@@ -0,0 +1,69 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from orders_app.models import BusinessDailyRollup, BusinessOrderCounter, Order, OrderEvent
+from user_auth_app.models import UserProfile
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_status(sender, instance, update_fields=None, **kwargs):
+    """
+    Makes sure the status, price and delivery time the order had in the database are
+    known before it is saved, also for instances that were not loaded with them.
+    """
+    missing = [
+        field for field in Order.LOADED_FIELDS
+        if not hasattr(instance, f'_loaded_{field}') and (update_fields is None or field in update_fields)
+    ]
+    if instance.pk is not None and missing:
+        loaded = Order.objects.filter(pk=instance.pk).values(*missing).first() or {}
+        for field in missing:
+            setattr(instance, f'_loaded_{field}', loaded.get(field))
+
+
+def get_loaded_value(instance, field, update_fields):
+    """
+    Returns the database value of `field` before this save, or None if the field was not saved.
+    """
+    if update_fields is not None and field not in update_fields:
+        return None
+    return getattr(instance, f'_loaded_{field}', None)
+
+
+@receiver(post_save, sender=Order)
+def count_saved_order(sender, instance, created, update_fields=None, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_status', None)
+    if previous is not None:
+        BusinessDailyRollup.apply_order_edit(
+            instance, previous,
+            previous_price=get_loaded_value(instance, 'price', update_fields),
+            previous_delivery_time=get_loaded_value(instance, 'delivery_time_in_days', update_fields),
+        )
+    if previous == instance.status:
+        return
+    changes = {instance.status: 1}
+    if previous is not None:
+        changes[previous] = -1
+    BusinessOrderCounter.apply(instance.business_user_id, changes)
+    BusinessDailyRollup.apply_order(instance, previous_status=previous)
+
+    if created:
+        OrderEvent.publish(OrderEvent.CREATED, instance, title=instance.title)
+    else:
+        OrderEvent.publish(OrderEvent.STATUS_CHANGED, instance, previous_status=previous)
+
+
+@receiver(post_delete, sender=Order)
+def count_deleted_order(sender, instance, **kwargs):
+    status = getattr(instance, '_loaded_status', instance.status)
+    BusinessOrderCounter.apply(instance.business_user_id, {status: -1}, create=False)
+    BusinessDailyRollup.apply_order(instance, sign=-1, status=status)
+
+
+@receiver(post_save, sender=UserProfile)
+def create_order_counter(sender, instance, **kwargs):
+    """
+    Business users get their counter row up front, so the count endpoints
+    never have to fall back to counting.
+    """
+    if instance.type == 'business':
+        BusinessOrderCounter.objects.get_or_create(business_user_id=instance.user_id)
@@ -1,8 +1,21 @@
-from rest_framework.test import APITestCase, APIClient
+import csv
+import io
+import json
+from django.core.management import call_command
+from rest_framework.test import APITestCase, APITransactionTestCase, APIClient, APIRequestFactory
+from rest_framework.request import Request
+from django.db import IntegrityError, connection
+from django.utils import timezone
+from datetime import timedelta
+from django.test.utils import CaptureQueriesContext
+from orders_app.api.views import OrderViewSet
 from django.urls import reverse
 from rest_framework import status
 from user_auth_app.models import UserProfile
-from orders_app.models import Order
+from orders_app.models import ArchivedOrder, BusinessDailyRollup, BusinessOrderCounter, FeatureSnapshot, Order, OrderEvent
+from orders_app.events import read_stream_token
+from asgiref.sync import sync_to_async
+from django.test import override_settings
 from orders_app.api.serializers import OrderSerializer, OrderUpdateSerializer
 from offers_app.models import Offer, OfferDetail
 from django.contrib.auth.models import User
@@ -350,4 +363,465 @@ class OrderTest(APITestCase):
         url = reverse('completed-order-count', kwargs={'business_user_id': non_existing_business_user_id})
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
-        self.assertEqual(response.data['detail'], 'User is not a business user')
\ No newline at end of file
+        self.assertEqual(response.data['detail'], 'User is not a business user')
+
+    def test_export_orders_as_csv(self):
+        self.create_offer_with_details()
+        self.create_orders_for_offers()
+        self.client.credentials(HTTP_AUTHORIZATION = 'Token ' + self.token_business.key)
+
+        response = self.client.get(reverse('order-export'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual(len(rows), Order.objects.count())
+        first = Order.objects.order_by('id').first()
+        self.assertEqual(int(rows[0]['id']), first.id)
+        self.assertEqual(int(rows[0]['business_user']), self.user_business.id)
+        self.assertEqual(json.loads(rows[0]['features']), first.snapshot_features)
+
+    def test_export_orders_as_ndjson(self):
+        self.create_offer_with_details()
+        self.create_orders_for_offers()
+
+        response = self.client.get(reverse('order-export'), {'export_format': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], list(Order.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_export_orders_rejects_unknown_format(self):
+        response = self.client.get(reverse('order-export'), {'export_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_orders_command(self):
+        self.create_offer_with_details()
+        self.create_orders_for_offers()
+        out = io.StringIO()
+        call_command('export_orders', user=str(self.user_business.id), format='ndjson', chunk_size=2, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), Order.objects.count())
+
+    def assertCounter(self, in_progress, completed, cancelled):
+        counter = BusinessOrderCounter.objects.get(pk=self.user_business.pk)
+        self.assertEqual((counter.in_progress, counter.completed, counter.cancelled), (in_progress, completed, cancelled))
+
+    def test_order_counter_follows_create_status_change_and_delete(self):
+        self.create_offer_with_details(count=3)
+        self.create_orders_for_offers()
+        self.assertCounter(3, 0, 0)
+
+        order = Order.objects.first()
+        self.client.credentials(HTTP_AUTHORIZATION = 'Token ' + self.token_business.key)
+        self.client.patch(reverse('order-detail', kwargs={'pk': order.pk}), {'status': 'completed'}, format='json')
+        self.assertCounter(2, 1, 0)
+
+        order = Order.objects.only('id', 'business_user').last()
+        order.status = 'cancelled'
+        order.save()
+        self.assertCounter(1, 1, 1)
+
+        Order.objects.get(pk=order.pk).delete()
+        self.assertCounter(1, 1, 0)
+
+    def test_order_count_is_a_single_query(self):
+        self.create_offer_with_details(count=2)
+        self.create_orders_for_offers()
+        self.client.credentials(HTTP_AUTHORIZATION = 'Token ' + self.token_business.key)
+        url = reverse('order-count', kwargs={'business_user_id': self.user_business.id})
+        self.client.get(url)
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.data['order_count'], 2)
+
+    def test_rebuild_order_counters_command(self):
+        self.create_offer_with_details(count=2)
+        self.create_orders_for_offers()
+        BusinessOrderCounter.objects.all().delete()
+        Order.objects.filter(pk=Order.objects.first().pk).update(status='completed')
+
+        call_command('rebuild_order_counters', stdout=io.StringIO())
+        self.assertCounter(1, 1, 0)
+
+    def test_get_batch_order_counts(self):
+        self.create_offer_with_details(count=2)
+        self.create_orders_for_offers()
+        order = Order.objects.first()
+        order.status = 'completed'
+        order.save()
+        self.client.credentials(HTTP_AUTHORIZATION = 'Token ' + self.token_business.key)
+        missing_id = User.objects.order_by('-id').first().id + 1
+        ids = [self.user_business.id, self.user_customer.id, missing_id]
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('order-counts'), {'business_user_ids': ','.join(map(str, ids))})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry['business_user_id'] for entry in response.data], ids)
+        business, customer, missing = response.data
+        self.assertEqual((business['order_count'], business['completed_order_count']), (1, 1))
+        self.assertEqual((customer['status'], customer['detail']), (404, 'User is not a business user'))
+        self.assertEqual(missing['status'], 404)
+
+    def test_get_batch_order_counts_invalid_ids(self):
+        response = self.client.get(reverse('order-counts'), {'business_user_ids': '1,abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('order-counts'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_orders_cursor_pagination(self):
+        self.create_offer_with_details()
+        self.create_orders_for_offers()
+        expected = list(Order.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        for token in [self.token_customer, self.token_business]:
+            self.client.credentials(HTTP_AUTHORIZATION = 'Token ' + token.key)
+            response = self.client.get(reverse('order-list'), {'pagination': 'cursor', 'page_size': 2})
+            ids = [order['id'] for order in response.data['results']]
+            while response.data['next']:
+                response = self.client.get(response.data['next'])
+                ids += [order['id'] for order in response.data['results']]
+            self.assertEqual(ids, expected)
+
+            previous = self.client.get(response.data['previous'])
+            self.assertEqual([order['id'] for order in previous.data['results']], expected[-3:-1])
+
+    def test_get_orders_filtered_by_status_and_date(self):
+        self.create_offer_with_details(count=3)
+        self.create_orders_for_offers()
+        order = Order.objects.first()
+        order.status = 'completed'
+        order.save()
+        Order.objects.filter(pk=Order.objects.last().pk).update(created_at='2020-01-01T12:00:00Z')
+
+        response = self.client.get(reverse('order-list'), {'status': 'completed'})
+        self.assertEqual([item['id'] for item in response.data], [order.id])
+
+        response = self.client.get(reverse('order-list'), {'created_before': '2021-01-01', 'pagination': 'cursor'})
+        self.assertEqual([item['id'] for item in response.data['results']], [Order.objects.last().id])
+
+        response = self.client.get(reverse('order-list'), {'created_after': '2021-01-01T00:00:00Z'})
+        self.assertEqual(len(response.data), 2)
+
+    def test_get_orders_invalid_filters(self):
+        for params in [{'status': 'unknown'}, {'created_after': 'yesterday'}]:
+            response = self.client.get(reverse('order-list'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_orders_query_uses_both_indexes(self):
+        view = OrderViewSet()
+        view.action = 'list'
+        view.request = Request(APIRequestFactory().get('/api/orders/'))
+        view.request.user = self.user_business
+        branches = view.get_list_branches()
+        queryset = branches[0].union(*branches[1:], all=True).order_by('-created_at', '-id')[:21]
+
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = '\n'.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('order_customer_created_idx', plan)
+        self.assertIn('order_business_created_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def archive_completed_order(self):
+        self.create_offer_with_details(count=3)
+        self.create_orders_for_offers()
+        order = Order.objects.first()
+        order.status = 'completed'
+        order.save()
+        Order.objects.filter(pk=order.pk).update(updated_at='2020-01-01T12:00:00Z')
+        call_command('archive_orders', older_than_days=30, batch_size=1, stdout=io.StringIO())
+        return order
+
+    def test_archive_orders_command_moves_old_finished_orders(self):
+        order = self.archive_completed_order()
+
+        self.assertFalse(Order.objects.filter(pk=order.pk).exists())
+        archived = ArchivedOrder.objects.get(pk=order.pk)
+        self.assertEqual((archived.status, archived.title, archived.business_user_id), ('completed', order.title, order.business_user_id))
+        self.assertEqual(Order.objects.count(), 2)
+        counter = BusinessOrderCounter.objects.get(pk=self.user_business.pk)
+        self.assertEqual((counter.in_progress, counter.completed, counter.archived_completed), (2, 0, 1))
+
+        BusinessOrderCounter.objects.all().delete()
+        call_command('rebuild_order_counters', stdout=io.StringIO())
+        counter = BusinessOrderCounter.objects.get(pk=self.user_business.pk)
+        self.assertEqual((counter.in_progress, counter.completed, counter.archived_completed), (2, 0, 1))
+
+    def test_archive_batch_keeps_orders_when_the_copy_conflicts(self):
+        self.create_offer_with_details(count=1)
+        self.create_orders_for_offers()
+        order = Order.objects.get()
+        order.change_status('completed')
+        ArchivedOrder.objects.create(**{
+            **Order.objects.filter(pk=order.pk).values(*ArchivedOrder.COPIED_FIELDS).get(), 'title': 'Alte Kopie'
+        })
+
+        with self.assertRaises(IntegrityError):
+            ArchivedOrder.archive_batch(timezone.now() + timedelta(days=1), batch_size=10)
+        self.assertTrue(Order.objects.filter(pk=order.pk).exists())
+        self.assertEqual(ArchivedOrder.objects.get(pk=order.pk).title, 'Alte Kopie')
+        self.assertCounter(0, 1, 0)
+
+    def test_export_orders_includes_archived_orders(self):
+        order = self.archive_completed_order()
+        expected = list(Order.objects.order_by('id').values_list('id', flat=True)) + [order.id]
+
+        response = self.client.get(reverse('order-export'), {'export_format': 'ndjson'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode('utf-8').splitlines()]
+        self.assertEqual([row['id'] for row in rows], expected)
+        self.assertEqual((rows[-1]['status'], rows[-1]['features']), ('completed', order.snapshot_features))
+
+        response = self.client.get(reverse('order-export'))
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual(int(rows[-1]['id']), order.id)
+
+        out = io.StringIO()
+        call_command('export_orders', user=str(self.user_business.id), format='ndjson', chunk_size=1, stdout=out)
+        self.assertEqual([json.loads(line)['id'] for line in out.getvalue().splitlines()], expected)
+
+    def test_get_orders_include_archived(self):
+        order = self.archive_completed_order()
+        expected = list(Order.objects.values_list('id', flat=True)) + [order.id]
+
+        response = self.client.get(reverse('order-list'))
+        self.assertNotIn(order.id, [item['id'] for item in response.data])
+
+        response = self.client.get(reverse('order-list'), {'include_archived': 1})
+        self.assertEqual([item['id'] for item in response.data], sorted(expected))
+        archived = next(item for item in response.data if item['id'] == order.id)
+        self.assertEqual((archived['status'], archived['business_user']), ('completed', self.user_business.id))
+
+        response = self.client.get(reverse('order-list'), {'include_archived': 1, 'status': 'completed', 'pagination': 'cursor'})
+        self.assertEqual([item['id'] for item in response.data['results']], [order.id])
+
+    def test_order_counts_include_archived(self):
+        self.archive_completed_order()
+        url = reverse('completed-order-count', kwargs={'business_user_id': self.user_business.id})
+        self.assertEqual(self.client.get(url).data['completed_order_count'], 0)
+        self.assertEqual(self.client.get(url, {'include_archived': 1}).data['completed_order_count'], 1)
+
+        params = {'business_user_ids': str(self.user_business.id), 'include_archived': 1}
+        entry = self.client.get(reverse('order-counts'), params).data[0]
+        self.assertEqual((entry['order_count'], entry['completed_order_count']), (2, 1))
+
+    def test_orders_share_feature_snapshots(self):
+        self.create_offer_with_details(count=3)
+        self.create_orders_for_offers()
+        self.create_orders_for_offers()
+
+        self.assertEqual(Order.objects.count(), 6)
+        self.assertEqual(FeatureSnapshot.objects.count(), 1)
+        self.assertFalse(Order.objects.filter(features__isnull=False).exists())
+
+        response = self.client.get(reverse('order-list'))
+        self.assertEqual([item['features'] for item in response.data], [["Feature 1", "Feature 2"]] * 6)
+
+    def test_deduplicate_order_features_command(self):
+        self.create_offer_with_details(count=3)
+        self.create_orders_for_offers()
+        Order.objects.update(feature_snapshot=None, features=["Feature 1", "Feature 2"])
+        FeatureSnapshot.objects.all().delete()
+        before = self.client.get(reverse('order-list')).data
+
+        call_command('deduplicate_order_features', batch_size=2, stdout=io.StringIO())
+
+        self.assertEqual(FeatureSnapshot.objects.count(), 1)
+        self.assertFalse(Order.objects.filter(feature_snapshot__isnull=True).exists())
+        self.assertFalse(Order.objects.filter(features__isnull=False).exists())
+        self.assertEqual(self.client.get(reverse('order-list')).data, before)
+
+    def test_daily_rollups_follow_create_status_change_and_delete(self):
+        self.create_offer_with_details(count=3)
+        self.create_orders_for_offers()
+        first, second, third = Order.objects.order_by('id')
+        self.client.credentials(HTTP_AUTHORIZATION = 'Token ' + self.token_business.key)
+        self.client.patch(reverse('order-detail', kwargs={'pk': first.pk}), {'status': 'completed'}, format='json')
+        third.status = 'cancelled'
+        third.save()
+        second.delete()
+
+        rollup = BusinessDailyRollup.objects.get(business_user=self.user_business)
+        values = [getattr(rollup, field) for field in BusinessDailyRollup.COUNTER_FIELDS]
+        self.assertEqual(values, [2, 0, 1, 1, first.price, first.delivery_time_in_days + third.delivery_time_in_days])
+
+        BusinessDailyRollup.objects.all().delete()
+        call_command('rebuild_order_rollups', stdout=io.StringIO())
+        rebuilt = BusinessDailyRollup.objects.get(business_user=self.user_business)
+        self.assertEqual([getattr(rebuilt, field) for field in BusinessDailyRollup.COUNTER_FIELDS], values)
+
+    def test_daily_rollups_follow_price_and_delivery_time_edits(self):
+        self.create_offer_with_details(count=2)
+        self.create_orders_for_offers()
+        first, second = Order.objects.order_by('id')
+        first.status = 'completed'
+        first.save()
+
+        first.price = first.price + 25
+        first.delivery_time_in_days = first.delivery_time_in_days + 2
+        first.save()
+        self.assertEqual(BusinessDailyRollup.objects.get(business_user=self.user_business).revenue, first.price)
+        second = Order.objects.only('id', 'price', 'status', 'business_user_id', 'created_at').get(pk=second.pk)
+        second.price = 999
+        second.save()
+        edited = Order.objects.get(pk=first.pk)
+        edited.status = 'cancelled'
+        edited.save()
+        first.refresh_from_db()
+        first.status = 'completed'
+        first.save(update_fields=['status'])
+
+        rollup = BusinessDailyRollup.objects.get(business_user=self.user_business)
+        values = [getattr(rollup, field) for field in BusinessDailyRollup.COUNTER_FIELDS]
+        BusinessDailyRollup.rebuild()
+        rebuilt = BusinessDailyRollup.objects.get(business_user=self.user_business)
+        self.assertEqual([getattr(rebuilt, field) for field in BusinessDailyRollup.COUNTER_FIELDS], values)
+        self.assertEqual(rollup.revenue, first.price)
+
+    def test_get_order_analytics(self):
+        self.create_offer_with_details(count=2)
+        self.create_orders_for_offers()
+        order = Order.objects.first()
+        order.status = 'completed'
+        order.save()
+        BusinessDailyRollup.objects.create(
+            business_user=self.user_business, day='2020-01-02', order_count=1, completed=1, revenue=40, delivery_time_total=3
+        )
+        self.client.credentials(HTTP_AUTHORIZATION = 'Token ' + self.token_business.key)
+        url = reverse('order-analytics', kwargs={'business_user_id': self.user_business.id})
+
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['days']), 30)
+        self.assertEqual(response.data['totals']['order_count'], 2)
+        self.assertEqual(response.data['totals']['revenue'], order.price)
+        self.assertEqual(response.data['days'][-1]['completed'], 1)
+
+        response = self.client.get(url, {'date_from': '2020-01-01', 'date_to': '2020-01-03'})
+        self.assertEqual([day['order_count'] for day in response.data['days']], [0, 1, 0])
+        self.assertEqual(response.data['totals']['avg_delivery_time'], 3)
+        self.assertIsNone(response.data['days'][0]['avg_delivery_time'])
+
+    def test_get_order_analytics_errors(self):
+        url = reverse('order-analytics', kwargs={'business_user_id': self.user_business.id})
+        response = self.client.get(url, {'date_from': '2020-02-01', 'date_to': '2020-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, {'date_from': 'soon'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.credentials(HTTP_AUTHORIZATION = 'Token ' + self.token_customer.key)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        url = reverse('order-analytics', kwargs={'business_user_id': self.user_customer.id})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_update_order_status_writes_only_status(self):
+        self.create_offer_with_details(count=1)
+        self.create_orders_for_offers()
+        order = Order.objects.first()
+        self.client.credentials(HTTP_AUTHORIZATION = 'Token ' + self.token_business.key)
+        url = reverse('order-detail', kwargs={'pk': order.id})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'status': 'cancelled', 'title': 'ignored'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'cancelled')
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE "orders_app_order"')]
+        self.assertEqual(len(updates), 1)
+        assignments, condition = updates[0].split(' WHERE ')
+        self.assertIn('"status" = \'cancelled\'', assignments)
+        self.assertNotIn('"title"', assignments)
+        self.assertNotIn('"features"', assignments)
+        self.assertIn('"status" = \'in_progress\'', condition)
+        self.assertCounter(0, 0, 1)
+
+    def test_update_order_status_invalid_transition_returns_409(self):
+        self.create_offer_with_details(count=1)
+        self.create_orders_for_offers()
+        order = Order.objects.first()
+        Order.objects.filter(pk=order.pk).update(status='completed')
+        self.client.credentials(HTTP_AUTHORIZATION = 'Token ' + self.token_business.key)
+
+        response = self.client.patch(reverse('order-detail', kwargs={'pk': order.id}), {'status': 'cancelled'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'completed')
+
+    def test_change_status_fails_when_status_changed_concurrently(self):
+        self.create_offer_with_details(count=1)
+        self.create_orders_for_offers()
+        order = Order.objects.first()
+        stale = Order.objects.get(pk=order.pk)
+        self.assertTrue(order.change_status('completed'))
+        self.assertFalse(stale.change_status('cancelled'))
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'completed')
+        self.assertCounter(0, 1, 0)
+
+    def test_order_events_written_for_create_and_status_change(self):
+        self.create_offer_with_details(count=1)
+        self.create_orders_for_offers()
+        order = Order.objects.first()
+        order.change_status('completed')
+
+        events = OrderEvent.for_user(self.user_business.id, 0)
+        self.assertEqual([event.event for event in events], [OrderEvent.CREATED, OrderEvent.STATUS_CHANGED])
+        self.assertEqual(events[1].data['previous_status'], 'in_progress')
+        self.assertEqual(len(OrderEvent.for_user(self.user_customer.id, events[0].id)), 1)
+        self.assertEqual(OrderEvent.for_user(self.admin_user.id, 0), [])
+
+    def test_order_event_stream_requires_asgi(self):
+        response = self.client.get(reverse('order-events'))
+        self.assertEqual(response.status_code, 501)
+
+    def test_order_event_stream_token(self):
+        self.client.credentials()
+        response = self.client.post(reverse('order-events-token'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token_business.key)
+        response = self.client.post(reverse('order-events-token'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(read_stream_token(response.data['token']), self.user_business.id)
+        self.assertIsNone(read_stream_token(self.token_business.key))
+        with override_settings(ORDER_EVENTS={'STREAM_TOKEN_MAX_AGE': -1}):
+            self.assertIsNone(read_stream_token(response.data['token']))
+
+
+class OrderEventStreamTest(APITransactionTestCase):
+    """
+    The stream reads events on a worker thread with its own connection, which only
+    sees committed rows, so these tests run without the per-test transaction.
+    """
+
+    setUp = OrderTest.setUp
+    get_offer_data = OrderTest.get_offer_data
+    create_offer_with_details = OrderTest.create_offer_with_details
+    create_orders_for_offers = OrderTest.create_orders_for_offers
+
+    @override_settings(ORDER_EVENTS={'POLL_INTERVAL': 0.01})
+    async def test_order_event_stream(self):
+        response = await self.async_client.get(reverse('order-events'))
+        self.assertEqual(response.status_code, 401)
+
+        await sync_to_async(self.create_offer_with_details)(count=1)
+        await sync_to_async(self.create_orders_for_offers)()
+        response = await self.async_client.get(
+            reverse('order-events'), {'token': self.token_business.key, 'last_event_id': 0}
+        )
+        self.assertEqual(response.status_code, 401)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token_business.key)
+        stream_token = (await sync_to_async(self.client.post)(reverse('order-events-token'))).data['token']
+        response = await self.async_client.get(
+            reverse('order-events'), {'token': stream_token, 'last_event_id': 0}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        chunks = response.streaming_content.__aiter__()
+        self.assertTrue((await chunks.__anext__()).startswith(b'retry:'))
+        event = (await chunks.__anext__()).decode('utf-8')
+        self.assertIn('event: order_created', event)
+        order_id = await sync_to_async(lambda: Order.objects.get().id)()
+        self.assertIn(f'"order_id": {order_id}', event)
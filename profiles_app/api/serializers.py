@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from user_auth_app.models import UserProfile
 from django.contrib.auth.models import User
+from core.images import derivative_urls
+from reviews_app.api.serializers import RatingSummarySerializer
+from reviews_app.models import BusinessRatingSummary
 
 class UserProfileSerializer(serializers.ModelSerializer):
     """
@@ -21,6 +24,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
     Update:
         - Supports updating nested User fields (email, first_name, last_name).
         - Updates UserProfile fields accordingly.
+
+    Business profiles additionally contain the read-only `rating_summary`.
     """
 
     user = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -74,6 +79,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
         data['email'] = instance.user.email
         data['first_name'] = instance.user.first_name
         data['last_name'] = instance.user.last_name
+        if instance.type == 'business':
+            data['rating_summary'] = RatingSummarySerializer(BusinessRatingSummary.for_user(instance.user)).data
         return data
 
 class CustomerProfileListSerializer(serializers.ModelSerializer):
@@ -86,6 +93,7 @@ class CustomerProfileListSerializer(serializers.ModelSerializer):
         - first_name: User's first name.
         - last_name: User's last name.
         - file: Profile file.
+        - file_derivatives: Thumbnail URLs and inline placeholder of the profile file.
         - uploaded_at: DateTime when the profile was created.
         - type: Profile type (should be 'customer').
     """
@@ -94,14 +102,18 @@ class CustomerProfileListSerializer(serializers.ModelSerializer):
     first_name = serializers.CharField(source='user.first_name', allow_blank=True, default='')
     last_name = serializers.CharField(source='user.last_name', allow_blank=True, default='')
     uploaded_at = serializers.DateTimeField(source='created_at', read_only=True)
+    file_derivatives = serializers.SerializerMethodField()
 
     class Meta:
         model = UserProfile
         fields = [
-            'user', 'username', 'first_name', 'last_name', 'file',
+            'user', 'username', 'first_name', 'last_name', 'file', 'file_derivatives',
             'uploaded_at', 'type'
         ]
 
+    def get_file_derivatives(self, obj):
+        return derivative_urls(obj.file_derivatives, obj.file.storage, self.context.get('request'))
+
 class BusinessProfileListSerializer(serializers.ModelSerializer):
     """
     Serializer to list business profiles.
@@ -112,16 +124,26 @@ class BusinessProfileListSerializer(serializers.ModelSerializer):
         - first_name: User's first name.
         - last_name: User's last name.
         - file, location, tel, description, working_hours: Business profile specific fields.
+        - file_derivatives: Thumbnail URLs and inline placeholder of the profile file.
         - type: Profile type (should be 'business').
+        - rating_summary: Review count, average rating, 1-5 histogram and latest review time.
     """
     
     username = serializers.CharField(source='user.username', read_only=True)
     first_name = serializers.CharField(source='user.first_name', allow_blank=True, default='')
     last_name = serializers.CharField(source='user.last_name', allow_blank=True, default='')
+    file_derivatives = serializers.SerializerMethodField()
+    rating_summary = serializers.SerializerMethodField()
 
     class Meta:
         model = UserProfile
         fields = [
-            'user', 'username', 'first_name', 'last_name', 'file', 'location', 'tel', 'description',
-            'working_hours', 'type',
-        ]
\ No newline at end of file
+            'user', 'username', 'first_name', 'last_name', 'file', 'file_derivatives', 'location', 'tel', 'description',
+            'working_hours', 'type', 'rating_summary',
+        ]
+
+    def get_file_derivatives(self, obj):
+        return derivative_urls(obj.file_derivatives, obj.file.storage, self.context.get('request'))
+
+    def get_rating_summary(self, obj):
+        return RatingSummarySerializer(BusinessRatingSummary.for_user(obj.user)).data
\ No newline at end of file
@@ -1,11 +1,13 @@
+from functools import partial
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from user_auth_app.models import UserProfile
 from .serializers import UserProfileSerializer, CustomerProfileListSerializer, BusinessProfileListSerializer
 from .permissions import IsOwnerOfProfile
+from core.conditional import ConditionalGetMixin, make_etag
 
 
-class UserProfileDetailView(generics.RetrieveUpdateAPIView):
+class UserProfileDetailView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     """
     API endpoint that allows a user to retrieve or update their own user profile.
 
@@ -16,12 +18,28 @@ class UserProfileDetailView(generics.RetrieveUpdateAPIView):
     Permissions:
         - The user must be authenticated.
         - The user must be the owner of the profile to update it.
+
+    Caching:
+        - GET supports conditional requests (ETag / Last-Modified) based on the
+          profile's `updated_at`, which every profile update and every change of the
+          user's name or email moves forward, and the `updated_at` of the business
+          user's rating summary.
     """
 
-    queryset = UserProfile.objects.all()
+    queryset = UserProfile.objects.select_related('user', 'user__rating_summary')
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated, IsOwnerOfProfile]
 
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs.get(self.lookup_field)
+        versions = UserProfile.objects.filter(pk=pk).values_list('updated_at', 'user__rating_summary__updated_at').first()
+        if versions is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        updated_at = max(version for version in versions if version is not None)
+        etag = make_etag('profile', pk, *[version.isoformat() if version else '' for version in versions])
+        return self.conditional_get(request, etag, updated_at, partial(super().retrieve, request, *args, **kwargs))
+
 class UserProfileListView(generics.ListAPIView):
     """
     API endpoint to retrieve a list of all customer profiles.
@@ -48,7 +66,7 @@ class BusinessProfileListView(generics.ListAPIView):
         - The user must be authenticated.
 
     Returns:
-        - List of user profiles where profile type is 'business'.
+        - List of user profiles where profile type is 'business', each with its rating summary.
     """
     
     queryset = UserProfile.objects.all()
@@ -56,4 +74,4 @@ class BusinessProfileListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return UserProfile.objects.filter(type='business')
\ No newline at end of file
+        return UserProfile.objects.filter(type='business').select_related('user', 'user__rating_summary')
\ No newline at end of file
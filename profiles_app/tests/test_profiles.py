@@ -5,6 +5,12 @@ from user_auth_app.models import UserProfile
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 from profiles_app.api.serializers import UserProfileSerializer
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from io import BytesIO
+from PIL import Image
+import shutil
+import tempfile
 
 class UserProfileTest(APITestCase):
     def setUp(self):
@@ -106,4 +112,58 @@ class UserProfileTest(APITestCase):
             returned_ids.append(item['user'])
         
         self.assertIn(business_user.pk, returned_ids)
-        self.assertNotIn(customer_user.pk, returned_ids)
\ No newline at end of file
+        self.assertNotIn(customer_user.pk, returned_ids)
+
+    def test_get_user_profile_not_modified(self):
+        url = reverse('profile_detail', kwargs={'pk': self.user.pk})
+        response = self.client.get(url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_get_user_profile_modified_after_patch(self):
+        url = reverse('profile_detail', kwargs={'pk': self.user.pk})
+        etag = self.client.get(url)['ETag']
+        self.client.patch(url, data={"first_name": "Max"}, format='json')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['first_name'], "Max")
+
+    def test_get_user_profile_modified_after_user_edit(self):
+        url = reverse('profile_detail', kwargs={'pk': self.user.pk})
+        etag = self.client.get(url)['ETag']
+        self.user.email = "changed@test.de"
+        self.user.save(update_fields=['email'])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], "changed@test.de")
+
+        etag = response['ETag']
+        self.user.save(update_fields=['last_login'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_business_profiles_list_exposes_file_derivatives(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        profile = self.user.userprofile
+        profile.type = 'business'
+        profile.save()
+        buffer = BytesIO()
+        Image.new('RGB', (300, 300), (10, 120, 200)).save(buffer, format='JPEG')
+
+        with override_settings(MEDIA_ROOT=media_root, IMAGE_DERIVATIVES={'ASYNC': False}):
+            url = reverse('profile_detail', kwargs={'pk': self.user.pk})
+            upload = SimpleUploadedFile('avatar.jpg', buffer.getvalue(), content_type='image/jpeg')
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(url, {'file': upload}, format='multipart')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            response = self.client.get(reverse('business_profiles'))
+            derivatives = response.data[0]['file_derivatives']
+            self.assertIn('small', derivatives)
+            self.assertTrue(derivatives['placeholder'].startswith('data:image/jpeg;base64,'))
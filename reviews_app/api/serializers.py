@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from reviews_app.models import Review
+from reviews_app.models import BusinessRatingSummary, Review
 
 REVIEW_FIELDS = ['id', 'business_user', 'reviewer', 'rating', 'description', 'created_at', 'updated_at']
 READ_ONLY_COMMON = ['id', 'reviewer', 'created_at', 'updated_at']
@@ -84,4 +84,22 @@ class UpdateReviewSerializer(BaseReviewSerializer):
         - business_user
     """
     class Meta(BaseReviewSerializer.Meta):
-        read_only_fields = READ_ONLY_UPDATE
\ No newline at end of file
+        read_only_fields = READ_ONLY_UPDATE
+
+class RatingSummarySerializer(serializers.ModelSerializer):
+    """
+    Serializer for the rating summary of a business user.
+
+    Fields:
+        - review_count
+        - average_rating (0 without reviews)
+        - histogram: number of reviews per rating, keyed "1" to "5"
+        - last_review_at: time of the latest review (or null)
+    """
+
+    average_rating = serializers.FloatField(read_only=True)
+    histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = BusinessRatingSummary
+        fields = ['review_count', 'average_rating', 'histogram', 'last_review_at']
@@ -1,7 +1,6 @@
-from reviews_app.api.serializers import ReviewSerializer, UpdateReviewSerializer
-from reviews_app.models import Review
-from user_auth_app.models import UserProfile
-from offers_app.models import Offer
+from reviews_app.api.serializers import RatingSummarySerializer, ReviewSerializer, UpdateReviewSerializer
+from reviews_app.models import BusinessRatingSummary, Review
+from reviews_app.stats import get_platform_stats
 from reviews_app.api.permissions import isUserFromTypeCustomer, isCreatorOfReview
 from rest_framework.views import APIView
 from rest_framework import mixins, viewsets
@@ -9,10 +8,28 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
-from django.db.models import Avg
+from django.db.models import Count, Max
+from functools import partial
+from core.conditional import ConditionalGetMixin, make_etag
+from core.pagination import KeysetCursorPagination
 from rest_framework import status
 
-class ReviewViewSet(mixins.ListModelMixin,
+class ReviewCursorPagination(KeysetCursorPagination):
+    """
+    Cursor based pagination for the review list (`?pagination=cursor`), newest first.
+
+    - Keyset on `updated_at` or `rating`, with `id` as tie-breaker.
+    - Every filter / ordering combination has a matching `Review` index.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering_fields = ['updated_at', 'rating']
+    default_ordering = '-updated_at'
+
+
+class ReviewViewSet(ConditionalGetMixin,
+                    mixins.ListModelMixin,
                     mixins.CreateModelMixin,
                     mixins.DestroyModelMixin,
                     mixins.UpdateModelMixin,
@@ -40,6 +57,16 @@ class ReviewViewSet(mixins.ListModelMixin,
     Serializer:
         - Uses `ReviewSerializer` for list and create actions.
         - Uses `UpdateReviewSerializer` for update actions.
+
+    Pagination:
+        - Without parameters the full list is returned as before.
+        - `?pagination=cursor` (or a `cursor` from a previous response) switches to
+          `ReviewCursorPagination`: `{next, previous, results}`, plus the business's
+          `rating_summary` when filtered by `business_user_id`.
+
+    Caching:
+        - `list` supports conditional requests. The validators are the query string
+          plus max(`updated_at`) and the row count of the filtered reviews.
     """
     
     serializer_class = ReviewSerializer
@@ -47,6 +74,19 @@ class ReviewViewSet(mixins.ListModelMixin,
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     ordering_fields = ['updated_at', 'rating']
 
+    @property
+    def paginator(self):
+        """
+        Cursor pagination when requested, otherwise the full list as before.
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = ReviewCursorPagination()
+            else:
+                self._paginator = None
+        return self._paginator
+
     def get_queryset(self):
         queryset = Review.objects.all()
 
@@ -58,8 +98,36 @@ class ReviewViewSet(mixins.ListModelMixin,
         if reviewer_id:
             queryset = queryset.filter(reviewer_id=reviewer_id)
 
-        return queryset.distinct()
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """
+        Answers 304 Not Modified from a cheap fingerprint of the filtered reviews
+        before serializing them.
+        """
+        fingerprint = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            last_modified=Max('updated_at'), count=Count('id')
+        )
+        last_modified = fingerprint['last_modified']
+        etag = make_etag(
+            'reviews', request.query_params.urlencode(), fingerprint['count'],
+            last_modified.isoformat() if last_modified else ''
+        )
+        return self.conditional_get(request, etag, last_modified, partial(super().list, request, *args, **kwargs))
     
+    def get_paginated_response(self, data):
+        """
+        Adds the rating summary of the filtered business to a cursor page.
+        """
+        response = super().get_paginated_response(data)
+        business_user_id = self.request.query_params.get('business_user_id', '')
+        if business_user_id.isdigit():
+            summary = BusinessRatingSummary.objects.filter(pk=business_user_id).first()
+            response.data['rating_summary'] = RatingSummarySerializer(
+                summary or BusinessRatingSummary(business_user_id=int(business_user_id))
+            ).data
+        return response
+
     def perform_create(self, serializer):
         """
         Save the reviewer as the current user on creation.
@@ -98,18 +166,18 @@ class GeneralInformationView(APIView):
         - average_rating: Average rating across all reviews (0 if none).
         - business_profile_count: Total number of business user profiles.
         - offer_count: Total number of offers.
+
+    Caching:
+        - Served from a snapshot (`reviews_app.stats.get_platform_stats`) that is
+          refreshed in the background once it is older than `BASE_INFO_CACHE['MAX_AGE']`.
+          The review figures come from the `BusinessRatingSummary` rows.
+        - `Age` header: age of the snapshot in seconds; `X-Cache`: `hit`, `stale` or `miss`.
     """
     permission_classes = [AllowAny]
 
     def get(self, request):
-        review_count = Review.objects.count()
-        average_rating = Review.objects.aggregate(average_rating=Avg('rating'))['average_rating'] or 0
-        business_profile_count = UserProfile.objects.filter(type='business').count()
-        offer_count = Offer.objects.count()
-
-        return Response({
-            'review_count': review_count,
-            'average_rating': average_rating,
-            'business_profile_count': business_profile_count,
-            'offer_count': offer_count
-        }, status=status.HTTP_200_OK)
+        data, age, state = get_platform_stats()
+        response = Response(data, status=status.HTTP_200_OK)
+        response['Age'] = str(int(age))
+        response['X-Cache'] = state
+        return response
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from reviews_app.models import BusinessRatingSummary
+
+
+class Command(BaseCommand):
+    """
+    Compares the per-business rating summaries with the reviews and rewrites the
+    rows that drifted or are missing.
+
+    Safe to run at any time; intended for repairing drift and for backfills.
+    """
+
+    help = "Reconciles the per-business rating summaries with the reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help="Only this business user id (repeatable).")
+
+    def handle(self, *args, **options):
+        drifted = BusinessRatingSummary.reconcile(options['users'])
+        if drifted:
+            self.stdout.write(f"Rewrote summaries of business users: {', '.join(map(str, drifted))}")
+        self.stdout.write(self.style.SUCCESS(f"Reconciled rating summaries, {len(drifted)} out of date."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from reviews_app.stats import refresh_platform_stats
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the cached `/api/base-info/` snapshot.
+
+    Run it periodically (e.g. via cron, more often than `BASE_INFO_CACHE['MAX_AGE']`)
+    so visitors never wait for the statistics queries.
+    """
+
+    help = "Refreshes the cached platform statistics snapshot."
+
+    def handle(self, *args, **options):
+        entry = refresh_platform_stats()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed base info: {entry['data']}"))
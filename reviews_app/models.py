@@ -1,5 +1,8 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # Create your models here.
 
@@ -11,5 +14,154 @@ class Review(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['business_user', 'updated_at'], name='review_business_updated_idx'),
+            models.Index(fields=['reviewer', 'updated_at'], name='review_reviewer_updated_idx'),
+            models.Index(fields=['business_user', 'rating', 'id'], name='review_business_rating_idx'),
+            models.Index(fields=['reviewer', 'rating', 'id'], name='review_reviewer_rating_idx'),
+            models.Index(fields=['updated_at', 'id'], name='review_updated_idx'),
+            models.Index(fields=['rating', 'id'], name='review_rating_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'rating' in instance.__dict__:
+            instance._loaded_rating = instance.rating
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the review and its `BusinessRatingSummary` change (see `reviews_app.signals`)
+        in one transaction.
+        """
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+        self._loaded_rating = self.rating
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            return super().delete(*args, **kwargs)
+
+    def __str__(self):
+        return f"Review by {self.reviewer.username} for {self.business_user.username} - Rating: {self.rating}"
+
+
+class BusinessRatingSummary(models.Model):
+    """
+    Rating aggregate of one business user: number and sum of the ratings, the
+    1-5 histogram and the time of the latest review (max `updated_at`).
+
+    Maintained by the `Review` signals in the same transaction as the review write,
+    so averages never have to aggregate the reviews.
+    `python manage.py reconcile_rating_summaries` recomputes the rows from the reviews.
+    """
+
+    RATINGS = range(1, 6)
+    HISTOGRAM_FIELDS = [f'rating_{rating}' for rating in RATINGS]
+    COUNTER_FIELDS = ['review_count', 'rating_sum'] + HISTOGRAM_FIELDS
+
+    business_user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    last_review_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
-        return f"Review by {self.reviewer.username} for {self.business_user.username} - Rating: {self.rating}"
\ No newline at end of file
+        return f"Rating summary for {self.business_user_id}"
+
+    @property
+    def average_rating(self):
+        return self.rating_sum / self.review_count if self.review_count else 0
+
+    @property
+    def histogram(self):
+        return {str(rating): getattr(self, f'rating_{rating}') for rating in self.RATINGS}
+
+    @classmethod
+    def for_user(cls, user):
+        """
+        The summary of `user`, or an empty (unsaved) one for users without reviews.
+        """
+        return getattr(user, 'rating_summary', None) or cls(business_user_id=user.pk)
+
+    @classmethod
+    def rating_changes(cls, rating, sign=1):
+        """
+        The `{field: delta}` changes of adding (or with `sign=-1` removing) one rating.
+        """
+        changes = {'review_count': sign, 'rating_sum': sign * rating}
+        if rating in cls.RATINGS:
+            changes[f'rating_{rating}'] = sign
+        return changes
+
+    @classmethod
+    def apply(cls, business_user_id, changes, last_review_at=None, create=True):
+        """
+        Adds the `{field: delta}` changes (`COUNTER_FIELDS`) to the summary of a business
+        user and moves `last_review_at` forward. Counters never drop below zero.
+
+        Without a `last_review_at` (a review was removed) it is re-read from the
+        `(business_user, updated_at)` index.
+        """
+        values = {field: Greatest(F(field) + delta, 0) for field, delta in changes.items() if delta and field in cls.COUNTER_FIELDS}
+        if last_review_at is None:
+            values['last_review_at'] = Review.objects.filter(business_user_id=business_user_id).aggregate(
+                last=Max('updated_at')
+            )['last']
+        else:
+            values['last_review_at'] = Greatest(Coalesce(F('last_review_at'), last_review_at), last_review_at)
+
+        updated = cls.objects.filter(pk=business_user_id).update(updated_at=timezone.now(), **values)
+        if not updated and create:
+            cls.objects.get_or_create(business_user_id=business_user_id, defaults={'last_review_at': last_review_at})
+            cls.objects.filter(pk=business_user_id).update(updated_at=timezone.now(), **values)
+
+    @classmethod
+    def compute(cls, business_user_ids=None):
+        """
+        Returns `{business_user_id: {field: value}}` computed from the reviews with one grouped query.
+        """
+        reviews = Review.objects.all()
+        if business_user_ids is not None:
+            reviews = reviews.filter(business_user__in=business_user_ids)
+        rows = reviews.values('business_user_id').annotate(
+            review_count=Count('id'),
+            rating_sum=Sum('rating'),
+            last_review_at=Max('updated_at'),
+            **{f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating in cls.RATINGS}
+        ).order_by()
+        return {row.pop('business_user_id'): row for row in rows}
+
+    @classmethod
+    def reconcile(cls, business_user_ids=None):
+        """
+        Compares the stored summaries with the reviews and rewrites the rows that
+        drifted (or are missing). Returns the ids of the rewritten summaries.
+        """
+        fields = cls.COUNTER_FIELDS + ['last_review_at']
+        expected = cls.compute(business_user_ids)
+        stored = cls.objects.all()
+        if business_user_ids is not None:
+            stored = stored.filter(pk__in=business_user_ids)
+        stored = {row.pop('business_user_id'): row for row in stored.values('business_user_id', *fields)}
+
+        empty = dict.fromkeys(cls.COUNTER_FIELDS, 0) | {'last_review_at': None}
+        drifted = {
+            pk: values for pk in expected.keys() | stored.keys()
+            if (values := expected.get(pk, empty)) != stored.get(pk)
+        }
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                [cls(business_user_id=pk, **values) for pk, values in drifted.items()],
+                update_conflicts=True,
+                unique_fields=['business_user'],
+                update_fields=fields + ['updated_at'],
+            )
+        return sorted(drifted)
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from reviews_app.models import BusinessRatingSummary, Review
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, **kwargs):
+    """
+    Makes sure the rating the review had in the database is known before it is saved,
+    also for instances that were not loaded with their `rating`.
+    """
+    if instance.pk is not None and not hasattr(instance, '_loaded_rating'):
+        instance._loaded_rating = Review.objects.filter(pk=instance.pk).values_list('rating', flat=True).first()
+
+
+@receiver(post_save, sender=Review)
+def summarize_saved_review(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_rating', None)
+    changes = BusinessRatingSummary.rating_changes(instance.rating)
+    if previous is not None:
+        for field, delta in BusinessRatingSummary.rating_changes(previous, sign=-1).items():
+            changes[field] = changes.get(field, 0) + delta
+    BusinessRatingSummary.apply(instance.business_user_id, changes, last_review_at=instance.updated_at)
+
+
+@receiver(post_delete, sender=Review)
+def summarize_deleted_review(sender, instance, **kwargs):
+    rating = getattr(instance, '_loaded_rating', instance.rating)
+    BusinessRatingSummary.apply(
+        instance.business_user_id, BusinessRatingSummary.rating_changes(rating, sign=-1), create=False
+    )
@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Sum
+from offers_app.models import Offer
+from reviews_app.models import BusinessRatingSummary
+from user_auth_app.models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = 'base_info:snapshot'
+REFRESH_LOCK_KEY = 'base_info:snapshot:lock'
+
+DEFAULT_BASE_INFO_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'MAX_AGE': 60,
+    'LOCK_TIMEOUT': 10,
+    'WAIT_INTERVAL': 0.05,
+    'ASYNC': True,
+}
+
+
+def get_base_info_cache_settings():
+    """
+    Returns `settings.BASE_INFO_CACHE` merged over the defaults.
+    """
+    return {**DEFAULT_BASE_INFO_CACHE_SETTINGS, **getattr(settings, 'BASE_INFO_CACHE', {})}
+
+
+def compute_platform_stats():
+    """
+    Runs the platform statistics queries. The review figures come from the
+    per-business `BusinessRatingSummary` rows.
+    """
+    ratings = BusinessRatingSummary.objects.aggregate(review_count=Sum('review_count'), rating_sum=Sum('rating_sum'))
+    review_count = ratings['review_count'] or 0
+    return {
+        'review_count': review_count,
+        'average_rating': ratings['rating_sum'] / review_count if review_count else 0,
+        'business_profile_count': UserProfile.objects.filter(type='business').count(),
+        'offer_count': Offer.objects.count(),
+    }
+
+
+def refresh_platform_stats():
+    """
+    Recomputes and stores the snapshot, then releases the refresh lock.
+    """
+    try:
+        entry = {'data': compute_platform_stats(), 'created': time.time()}
+        cache.set(SNAPSHOT_KEY, entry, timeout=None)
+        return entry
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+
+
+def get_platform_stats():
+    """
+    Returns `(data, age, state)`: the platform statistics, the age of the snapshot
+    in seconds and `'hit'`, `'stale'` or `'miss'`.
+
+    - Fresh snapshot (younger than `MAX_AGE`): served as is.
+    - Stale snapshot: served as is; the request that takes the refresh lock starts
+      one background recomputation.
+    - No snapshot: single flight. The request that takes the lock computes it,
+      concurrent requests wait for that result instead of running the queries too.
+    """
+    options = get_base_info_cache_settings()
+    if not options['ENABLED']:
+        return compute_platform_stats(), 0, 'miss'
+
+    entry = cache.get(SNAPSHOT_KEY)
+    if entry is not None:
+        age = time.time() - entry['created']
+        if age < options['MAX_AGE']:
+            return entry['data'], age, 'hit'
+        if cache.add(REFRESH_LOCK_KEY, 1, timeout=options['LOCK_TIMEOUT']):
+            schedule_refresh(options)
+        return entry['data'], age, 'stale'
+
+    if cache.add(REFRESH_LOCK_KEY, 1, timeout=options['LOCK_TIMEOUT']):
+        entry = refresh_platform_stats()
+    else:
+        entry = wait_for_snapshot(options)
+    if entry is None:
+        entry = {'data': compute_platform_stats(), 'created': time.time()}
+    return entry['data'], time.time() - entry['created'], 'miss'
+
+
+def wait_for_snapshot(options):
+    """
+    Polls for the snapshot another request is computing, at most `LOCK_TIMEOUT` seconds.
+    """
+    deadline = time.monotonic() + options['LOCK_TIMEOUT']
+    while time.monotonic() < deadline:
+        time.sleep(options['WAIT_INTERVAL'])
+        entry = cache.get(SNAPSHOT_KEY)
+        if entry is not None:
+            return entry
+    return None
+
+
+def schedule_refresh(options):
+    """
+    Refreshes the snapshot in a background thread unless `BASE_INFO_CACHE['ASYNC']` is disabled.
+    """
+    def run():
+        try:
+            refresh_platform_stats()
+        except Exception:
+            logger.exception("Refreshing the platform statistics failed")
+        finally:
+            if options['ASYNC']:
+                connections.close_all()
+
+    if options['ASYNC']:
+        threading.Thread(target=run, name='base-info-refresh', daemon=True).start()
+    else:
+        run()
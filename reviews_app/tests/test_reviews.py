@@ -1,15 +1,25 @@
+import threading
+import time
+from unittest import mock
 from rest_framework.test import APITestCase
+from django.core.cache import cache
+from django.test import override_settings
+from django.db import connection
+from reviews_app import stats
 from django.urls import reverse
 from rest_framework import status
 from django.contrib.auth.models import User
 from user_auth_app.models import UserProfile
-from reviews_app.models import Review
+import io
+from django.core.management import call_command
+from reviews_app.models import BusinessRatingSummary, Review
 from reviews_app.api.serializers import ReviewSerializer, UpdateReviewSerializer
 from rest_framework.authtoken.models import Token
 
 
 class ReviewTest(APITestCase):
     def setUp(self):
+        cache.clear()
         self.user_customer = User.objects.create(
             username='customer', password='customer123', email="customer@web.de")
         self.token_customer = Token.objects.create(user=self.user_customer)
@@ -384,4 +394,186 @@ class ReviewTest(APITestCase):
         self.assertIn('review_count', response.data)
         self.assertIn('average_rating', response.data)
         self.assertIn('business_profile_count', response.data)
-        self.assertIn('offer_count', response.data)
\ No newline at end of file
+        self.assertIn('offer_count', response.data)
+
+    def assertSummary(self, business_user, review_count, rating_sum, histogram):
+        summary = BusinessRatingSummary.objects.get(pk=business_user.pk)
+        self.assertEqual((summary.review_count, summary.rating_sum), (review_count, rating_sum))
+        self.assertEqual(summary.histogram, histogram)
+        return summary
+
+    def test_rating_summary_follows_create_update_and_delete(self):
+        url = reverse('review-list')
+        response = self.client.post(url, self.create_review_payload(rating=4), format='json')
+        business_user = User.objects.get(pk=response.data['business_user'])
+        summary = self.assertSummary(business_user, 1, 4, {'1': 0, '2': 0, '3': 0, '4': 1, '5': 0})
+        self.assertIsNotNone(summary.last_review_at)
+
+        detail_url = reverse('review-detail', kwargs={'pk': response.data['id']})
+        self.client.patch(detail_url, {'rating': 2}, format='json')
+        self.assertSummary(business_user, 1, 2, {'1': 0, '2': 1, '3': 0, '4': 0, '5': 0})
+
+        self.client.delete(detail_url)
+        summary = self.assertSummary(business_user, 0, 0, {'1': 0, '2': 0, '3': 0, '4': 0, '5': 0})
+        self.assertIsNone(summary.last_review_at)
+
+    def test_reconcile_rating_summaries_command(self):
+        self.create_review(5)
+        Review.objects.create(reviewer=self.user_customer_one, business_user=self.user_business_one, rating=3, description="Okay")
+        BusinessRatingSummary.objects.filter(pk=self.user_business_one.pk).update(review_count=7, rating_5=0)
+
+        out = io.StringIO()
+        call_command('reconcile_rating_summaries', stdout=out)
+        self.assertIn('1 out of date', out.getvalue())
+        self.assertSummary(self.user_business_one, 2, 8, {'1': 0, '2': 0, '3': 1, '4': 0, '5': 1})
+
+        out = io.StringIO()
+        call_command('reconcile_rating_summaries', stdout=out)
+        self.assertIn('0 out of date', out.getvalue())
+
+    def test_business_profiles_expose_rating_summary(self):
+        self.create_review(4)
+        Review.objects.create(reviewer=self.user_customer_one, business_user=self.user_business_one, rating=5, description="Great")
+
+        response = self.client.get(reverse('business_profiles'))
+        summaries = {profile['user']: profile['rating_summary'] for profile in response.data}
+        self.assertEqual(summaries[self.user_business_one.pk]['review_count'], 2)
+        self.assertEqual(summaries[self.user_business_one.pk]['average_rating'], 4.5)
+        self.assertEqual(summaries[self.user_business_one.pk]['histogram']['5'], 1)
+        self.assertEqual(summaries[self.user_business_two.pk]['review_count'], 0)
+
+        url = reverse('profile_detail', kwargs={'pk': self.user_business_one.userprofile.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.data['rating_summary']['review_count'], 2)
+
+        Review.objects.create(reviewer=self.user_customer_two, business_user=self.user_business_one, rating=1, description="Bad")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rating_summary']['review_count'], 3)
+
+    def test_get_base_info_reads_rating_summaries(self):
+        self.create_review(4)
+        Review.objects.create(reviewer=self.user_customer_one, business_user=self.user_business_two, rating=3, description="Okay")
+        response = self.client.get(reverse('general-information'))
+        self.assertEqual((response.data['review_count'], response.data['average_rating']), (2, 3.5))
+
+    def test_get_base_info_served_from_snapshot(self):
+        self.create_review(4)
+        url = reverse('general-information')
+        response = self.client.get(url)
+        self.assertEqual((response['X-Cache'], response.data['review_count']), ('miss', 1))
+
+        self.create_review(2)
+        self.client.credentials()
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual((response['X-Cache'], response.data['review_count']), ('hit', 1))
+        self.assertEqual(response['Age'], '0')
+
+    @override_settings(BASE_INFO_CACHE={'MAX_AGE': 0, 'ASYNC': False})
+    def test_get_base_info_stale_snapshot_is_refreshed(self):
+        url = reverse('general-information')
+        self.client.get(url)
+        self.create_review(4)
+
+        response = self.client.get(url)
+        self.assertEqual((response['X-Cache'], response.data['review_count']), ('stale', 0))
+        response = self.client.get(url)
+        self.assertEqual(response.data['review_count'], 1)
+
+    @override_settings(BASE_INFO_CACHE={'WAIT_INTERVAL': 0.01})
+    def test_get_base_info_cold_snapshot_is_computed_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'review_count': 0}
+
+        results = []
+        with mock.patch.object(stats, 'compute_platform_stats', compute):
+            threads = [threading.Thread(target=lambda: results.append(stats.get_platform_stats())) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([data for data, _, _ in results], [{'review_count': 0}] * 5)
+
+    def create_reviews_for(self, business_user, ratings):
+        reviewers = [User.objects.create(username=f'reviewer-{business_user.pk}-{i}') for i in range(len(ratings))]
+        return [
+            Review.objects.create(reviewer=reviewer, business_user=business_user, rating=rating, description="Okay")
+            for reviewer, rating in zip(reviewers, ratings)
+        ]
+
+    def test_get_review_list_cursor_pagination(self):
+        self.create_reviews_for(self.user_business_one, [3, 5, 1, 5, 2])
+        self.create_reviews_for(self.user_business_two, [4])
+        url = reverse('review-list')
+        params = {'pagination': 'cursor', 'page_size': 2, 'ordering': '-rating', 'business_user_id': self.user_business_one.id}
+        expected = list(
+            Review.objects.filter(business_user=self.user_business_one).order_by('-rating', '-id').values_list('id', flat=True)
+        )
+
+        response = self.client.get(url, params)
+        ids = [review['id'] for review in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            ids += [review['id'] for review in response.data['results']]
+        self.assertEqual(ids, expected)
+
+        summary = response.data['rating_summary']
+        self.assertEqual((summary['review_count'], summary['average_rating']), (5, 3.2))
+        self.assertEqual(summary['histogram'], {'1': 1, '2': 1, '3': 1, '4': 0, '5': 2})
+
+        response = self.client.get(url, {'pagination': 'cursor'})
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertNotIn('rating_summary', response.data)
+
+    def test_get_review_list_cursor_queries_use_indexes(self):
+        queries = {
+            'review_business_rating_idx': Review.objects.filter(business_user_id=1).order_by('-rating', '-id'),
+            'review_reviewer_rating_idx': Review.objects.filter(reviewer_id=1).order_by('rating', 'id'),
+            'review_rating_idx': Review.objects.order_by('rating', 'id'),
+            'review_updated_idx': Review.objects.order_by('-updated_at', '-id'),
+        }
+        for index, queryset in queries.items():
+            sql, params = queryset[:21].query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                plan = '\n'.join(row[-1] for row in cursor.fetchall())
+            self.assertIn(index, plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_get_review_list_not_modified(self):
+        self.create_review()
+        url = reverse('review-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(url, {'ordering': 'rating'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_review_list_modified_after_new_review(self):
+        review = self.create_review()
+        url = reverse('review-list')
+        etag = self.client.get(url)['ETag']
+        review.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_get_review_list_conditional_unauthorized(self):
+        self.create_review()
+        url = reverse('review-list')
+        etag = self.client.get(url)['ETag']
+        self.client.credentials()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
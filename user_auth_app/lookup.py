@@ -0,0 +1,17 @@
+from django.contrib.auth.models import User
+from django.core.management.base import CommandError
+
+
+def get_business_user(identifier):
+    """
+    Resolves a management command `--user` argument (username or id) to a business user.
+
+    Raises `CommandError` if the user does not exist or is not a business user.
+    """
+    lookup = {'pk': identifier} if identifier.isdigit() else {'username': identifier}
+    user = User.objects.select_related('userprofile').filter(**lookup).first()
+    if user is None:
+        raise CommandError(f"User '{identifier}' does not exist.")
+    if getattr(getattr(user, 'userprofile', None), 'type', None) != 'business':
+        raise CommandError(f"User '{identifier}' is not a business user.")
+    return user
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-18 04:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProfile',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('file', models.FileField(blank=True, null=True, upload_to='uploads/')),
+                ('file_derivatives', models.JSONField(blank=True, default=dict, editable=False)),
+                ('location', models.CharField(blank=True, default='', max_length=255)),
+                ('tel', models.CharField(blank=True, default='', max_length=20)),
+                ('description', models.TextField(blank=True, default='')),
+                ('working_hours', models.CharField(blank=True, default='', max_length=50)),
+                ('type', models.CharField(choices=[('business', 'Business'), ('customer', 'Customer')], default='customer', max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['type'], name='userprofile_type_idx')],
+            },
+        ),
+    ]
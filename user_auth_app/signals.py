@@ -1,9 +1,33 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
+from django.utils import timezone
 from user_auth_app.models import UserProfile
+from core.images import delete_derivatives, derivatives_are_current, schedule_derivatives
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
-        UserProfile.objects.get_or_create(user=instance, defaults={'type': 'customer'})
\ No newline at end of file
+        UserProfile.objects.get_or_create(user=instance, defaults={'type': 'customer'})
+
+PROFILE_USER_FIELDS = {'username', 'email', 'first_name', 'last_name'}
+
+@receiver(post_save, sender=User)
+def touch_user_profile(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Moves the profile's `updated_at` forward when a user field shown on the
+    profile changes, so the profile ETag / Last-Modified follow direct `User` edits.
+    Saves limited to other fields (e.g. `last_login`) leave the profile alone.
+    """
+    if created or (update_fields is not None and not PROFILE_USER_FIELDS.intersection(update_fields)):
+        return
+    UserProfile.objects.filter(user=instance).update(updated_at=timezone.now())
+
+@receiver(post_save, sender=UserProfile)
+def refresh_profile_file_derivatives(sender, instance, **kwargs):
+    if not derivatives_are_current(instance.file, instance.file_derivatives):
+        schedule_derivatives(UserProfile, instance.pk, 'file', 'file_derivatives', f'uploads/derivatives/profiles/{instance.pk}')
+
+@receiver(post_delete, sender=UserProfile)
+def delete_profile_file_derivatives(sender, instance, **kwargs):
+    delete_derivatives(instance.file.storage, instance.file_derivatives)